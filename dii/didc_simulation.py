@@ -10,6 +10,7 @@ demonstrating:
 4. Apparatus microstate dependence of outcomes
 """
 
+import os
 import numpy as np
 from scipy.integrate import odeint
 from scipy.stats import expon, beta
@@ -290,12 +291,19 @@ class EnsembleSimulation:
         self.overlaps_per_run = []
         self.collapse_strengths = []
     
-    def run(self, num_trials: int = 10000):
+    def run(self, num_trials: int = 10000, checkpoint: str = None,
+            checkpoint_every: int = 1000, resume: bool = False):
         """
         Execute ensemble of measurements.
         
         Args:
             num_trials: Number of independent measurements
+            checkpoint: If provided, save the completed trials, the global
+                NumPy RNG state and the per-trial results to this file
+                every `checkpoint_every` trials
+            checkpoint_every: Trials between checkpoints
+            resume: Continue from `checkpoint` if it exists; the restored
+                RNG state makes the result identical to an uninterrupted run
         """
         print(f"Running {num_trials} measurements with d_A = {self.d_A}...")
         
@@ -304,7 +312,12 @@ class EnsembleSimulation:
         self.overlaps_per_run = []
         self.collapse_strengths = []
         
-        for trial in range(num_trials):
+        first_trial = 0
+        if resume and checkpoint is not None and os.path.exists(checkpoint):
+            first_trial = self._load_checkpoint(checkpoint, num_trials)
+            print(f"  Resumed {first_trial}/{num_trials} trials from {checkpoint}")
+        
+        for trial in range(first_trial, num_trials):
             # Sample new apparatus microstate (independent for each trial)
             apparatus = ApparatusMicrostate(d_A=self.d_A, system_dim=self.num_outcomes)
             
@@ -321,8 +334,12 @@ class EnsembleSimulation:
             self.overlaps_per_run.append(apparatus.all_overlaps())
             self.collapse_strengths.append(measurement.collapse_strength())
             
-            if (trial + 1) % (num_trials // 10) == 0:
+            if (trial + 1) % max(1, num_trials // 10) == 0:
                 print(f"  {trial + 1}/{num_trials} trials completed")
+            
+            if checkpoint is not None and ((trial + 1) % checkpoint_every == 0
+                                           or trial + 1 == num_trials):
+                self._save_checkpoint(checkpoint, trial + 1, num_trials)
         
         self.outcomes = np.array(self.outcomes)
         self.weights_per_run = np.array(self.weights_per_run)
@@ -332,6 +349,56 @@ class EnsembleSimulation:
         # Compute observed frequencies
         self._compute_statistics()
     
+    def _save_checkpoint(self, path: str, completed: int, num_trials: int):
+        """
+        Write completed trials and the global RNG state to `path`.
+        
+        The file is written next to `path` and then moved into place, so an
+        interruption never leaves a truncated checkpoint behind.
+        """
+        _, keys, pos, has_gauss, cached_gaussian = np.random.get_state()
+        
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f,
+                     completed=completed,
+                     num_trials=num_trials,
+                     d_A=self.d_A,
+                     amplitudes=self.c,
+                     outcomes=np.array(self.outcomes),
+                     weights=np.array(self.weights_per_run),
+                     overlaps=np.array(self.overlaps_per_run),
+                     collapse_strengths=np.array(self.collapse_strengths),
+                     rng_keys=keys,
+                     rng_pos=pos,
+                     rng_has_gauss=has_gauss,
+                     rng_cached_gaussian=cached_gaussian)
+        os.replace(tmp_path, path)
+    
+    def _load_checkpoint(self, path: str, num_trials: int) -> int:
+        """
+        Restore trials and RNG state saved by _save_checkpoint.
+        
+        Returns:
+            Number of trials already completed
+        """
+        with np.load(path) as saved:
+            if (int(saved['num_trials']) != num_trials
+                    or int(saved['d_A']) != self.d_A
+                    or not np.allclose(saved['amplitudes'], self.c)):
+                raise ValueError(f"Checkpoint {path} was written by a different run")
+            
+            self.outcomes = list(saved['outcomes'])
+            self.weights_per_run = list(saved['weights'])
+            self.overlaps_per_run = list(saved['overlaps'])
+            self.collapse_strengths = list(saved['collapse_strengths'])
+            
+            np.random.set_state(('MT19937', saved['rng_keys'],
+                                 int(saved['rng_pos']),
+                                 int(saved['rng_has_gauss']),
+                                 float(saved['rng_cached_gaussian'])))
+            return int(saved['completed'])
+    
     def _compute_statistics(self):
         """Compute outcome frequencies and compare to Born rule"""
         self.observed_frequencies = np.array([
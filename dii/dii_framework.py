@@ -15,11 +15,382 @@ License: MIT
 """
 
 import numpy as np
-from scipy.integrate import odeint
+from scipy.integrate import odeint, RK23, RK45, DOP853, BDF
 from scipy.linalg import expm
-from dataclasses import dataclass
-from typing import Tuple, List, Optional, Callable
+from scipy import sparse
+from dataclasses import dataclass, replace
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Tuple, List, Optional, Callable, Sequence, Iterator
+import bisect
+import os
+import pickle
+import tempfile
 import warnings
+import zipfile
+
+
+# Adaptive Runge-Kutta solvers that step natively on complex state vectors
+RK_SOLVERS = {"RK23": RK23, "RK45": RK45, "DOP853": DOP853}
+# BDF is the only scipy implicit solver that integrates complex y directly
+IMPLICIT_SOLVERS = {"BDF": BDF}
+
+# "auto" switches from RK45 to BDF once this many consecutive steps have
+# h·ρ(J) beyond STIFF_STEP_LIMIT, i.e. sit at the edge of RK45's stability
+# region (≈3.3 on the negative real axis) instead of being set by accuracy
+STIFF_STEP_LIMIT = 2.5
+STIFF_STEP_COUNT = 10
+
+
+def partial_trace(rho: np.ndarray, dims: Sequence[int],
+                  keep: Sequence[int]) -> np.ndarray:
+    """
+    Reduced density matrix on the subsystems listed in `keep`.
+
+    The full space is the tensor product of subsystems with dimensions
+    `dims` (first subsystem is the slowest index, as with np.kron). Any
+    leading axes of `rho` are treated as a batch, so a (B, D, D) stack of
+    density matrices gives a (B, d_keep, d_keep) stack of reduced states.
+
+    The trace is a single einsum over a reshaped view of rho; no Python
+    loops over matrix elements and no copy of the full matrix.
+
+    Args:
+        rho: Density matrix (or batch of density matrices), shape (..., D, D)
+        dims: Subsystem dimensions, prod(dims) == D
+        keep: Indices of subsystems to keep (others are traced out)
+
+    Returns:
+        Reduced density matrix, shape (..., d_keep, d_keep)
+    """
+    dims = tuple(int(d) for d in dims)
+    n_sub = len(dims)
+    keep = sorted(set(int(k) for k in keep))
+    total_dim = int(np.prod(dims))
+
+    if rho.shape[-2:] != (total_dim, total_dim):
+        raise ValueError(
+            f"rho has shape {rho.shape}, expected (..., {total_dim}, {total_dim})"
+        )
+    if any(k < 0 or k >= n_sub for k in keep):
+        raise ValueError(f"keep={keep} out of range for {n_sub} subsystems")
+
+    batch_shape = rho.shape[:-2]
+    tensor = rho.reshape(batch_shape + dims + dims)
+
+    # Row indices 0..n-1, column indices n..2n-1; traced subsystems share
+    # their row index between bra and ket so einsum sums the diagonal.
+    row_idx = list(range(n_sub))
+    col_idx = [k if k not in keep else n_sub + k for k in range(n_sub)]
+    out_idx = list(keep) + [n_sub + k for k in keep]
+
+    reduced = np.einsum(tensor, [Ellipsis] + row_idx + col_idx,
+                        [Ellipsis] + out_idx)
+
+    d_keep = int(np.prod([dims[k] for k in keep]))
+    return reduced.reshape(batch_shape + (d_keep, d_keep))
+
+
+def integrate_ode(fun: Callable[[float, np.ndarray], np.ndarray],
+                  y0: np.ndarray, times: np.ndarray, method: str = "RK45",
+                  rtol: float = 1e-6, atol: float = 1e-9,
+                  jac: Optional[Callable] = None,
+                  spectral_radius: Optional[Callable[[float, np.ndarray], float]] = None
+                  ) -> Iterator[Tuple[float, np.ndarray]]:
+    """
+    Integrate dy/dt = fun(t, y) and yield (t, y) at each output time.
+
+    RK methods ("RK23", "RK45", "DOP853") step adaptively on complex y:
+    step sizes follow the dynamics and output times are filled in from
+    the dense interpolant, so the output cadence does not force extra
+    RHS evaluations. "BDF" is implicit, for stiff problems, and uses
+    `jac` (dense or sparse) when given. "auto" starts with RK45
+    and continues with BDF once steps become stability-limited, judged
+    from `spectral_radius(t, y)` (an upper bound on |eigenvalues| of the
+    Jacobian). "odeint" runs LSODA on the real view of y (it is
+    real-only) and evaluates the RHS on its own internal grid.
+
+    Args:
+        fun: Right-hand side, fun(t, y) -> dy/dt
+        y0: Initial state (real or complex)
+        times: Increasing output times, times[0] is the initial time
+        method: Integrator name
+        rtol, atol: Relative and absolute error tolerances
+        jac: Jacobian jac(t, y) for the implicit methods
+        spectral_radius: Stiffness estimate for "auto"
+
+    Yields:
+        (t, y) for every t in times
+    """
+    times = np.asarray(times, dtype=float)
+    if len(times) == 0:
+        return
+
+    if method == "odeint":
+        is_complex = np.iscomplexobj(y0)
+        y0_real = np.ascontiguousarray(y0, dtype=complex).view(np.float64) \
+            if is_complex else y0
+
+        def fun_real(t, y):
+            if not is_complex:
+                return fun(t, y)
+            dy = np.ascontiguousarray(fun(t, y.view(complex)), dtype=complex)
+            return dy.view(np.float64)
+
+        trajectory = odeint(fun_real, y0_real, times, tfirst=True,
+                            rtol=rtol, atol=atol)
+        for t, y in zip(times, trajectory):
+            yield t, (y.view(complex) if is_complex else y)
+        return
+
+    if method not in RK_SOLVERS and method not in IMPLICIT_SOLVERS and method != "auto":
+        raise ValueError(
+            f"Unknown integrator {method!r}; expected 'odeint', 'auto' or one "
+            f"of {tuple(RK_SOLVERS) + tuple(IMPLICIT_SOLVERS)}"
+        )
+    if method == "auto" and spectral_radius is None:
+        raise ValueError("integrator 'auto' needs a spectral_radius estimate")
+
+    def make_solver(name, t0, y):
+        if name in IMPLICIT_SOLVERS:
+            return IMPLICIT_SOLVERS[name](fun, t0, y, times[-1], rtol=rtol,
+                                          atol=atol, jac=jac)
+        return RK_SOLVERS[name](fun, t0, y, times[-1], rtol=rtol, atol=atol)
+
+    yield times[0], np.array(y0)
+    if len(times) == 1:
+        return
+
+    current = "RK45" if method == "auto" else method
+    solver = make_solver(current, times[0], y0)
+    stiff_steps = 0
+    idx = 1
+    while idx < len(times):
+        solver.step()
+        if solver.status == "failed":
+            raise RuntimeError(f"{current} integration failed at "
+                               f"t={solver.t}: {solver.message}")
+
+        # Interpolate every output time covered by this step
+        interpolant = None
+        while idx < len(times) and times[idx] <= solver.t:
+            if interpolant is None:
+                interpolant = solver.dense_output()
+            yield times[idx], interpolant(times[idx])
+            idx += 1
+
+        if method == "auto" and current == "RK45" and idx < len(times):
+            h = solver.t - solver.t_old
+            if h * spectral_radius(solver.t, solver.y) > STIFF_STEP_LIMIT:
+                stiff_steps += 1
+            else:
+                stiff_steps = 0
+            if stiff_steps >= STIFF_STEP_COUNT:
+                current = "BDF"
+                solver = make_solver(current, solver.t, solver.y)
+
+
+def system_blocks(rho: np.ndarray, system_dim: int) -> np.ndarray:
+    """
+    View a system ⊗ apparatus density matrix as a grid of apparatus blocks.
+
+    Returns a view of shape (..., d_S, d_A, d_S, d_A) in which
+    blocks[..., i, :, j, :] is the d_A × d_A block ⟨i|ρ|j⟩_S. Writing to
+    the view writes to rho.
+
+    Args:
+        rho: Density matrix (or stack), shape (..., D, D)
+        system_dim: System Hilbert space dimension d_S
+
+    Returns:
+        Block view of rho
+    """
+    total_dim = rho.shape[-1]
+    apparatus_dim = total_dim // system_dim
+    return rho.reshape(rho.shape[:-2] + (system_dim, apparatus_dim,
+                                         system_dim, apparatus_dim))
+
+
+def offdiagonal_block_mask(system_dim: int, dtype=float) -> np.ndarray:
+    """
+    Mask selecting the off-diagonal system blocks of a block view.
+
+    Shape (d_S, 1, d_S, 1) so it broadcasts against system_blocks(rho).
+    ρ - Σ_k P_k ρ P_k with P_k = |k⟩⟨k| ⊗ I_A is exactly mask * ρ. Pass
+    the real dtype of ρ to keep single-precision products in single.
+    """
+    mask = 1.0 - np.eye(system_dim, dtype=dtype)
+    return mask[:, None, :, None]
+
+
+def scale_offdiagonal_blocks(rho: np.ndarray, system_dim: int,
+                             factor: float) -> np.ndarray:
+    """
+    ρ with its off-diagonal system blocks multiplied by `factor`.
+
+    exp(-r h) for the rate r = γ + 2λF is the exact dephasing plus
+    collapse flow over a step h at fixed F. The result keeps ρ's dtype.
+    """
+    mask = offdiagonal_block_mask(system_dim, rho.real.dtype)
+    return (system_blocks(rho, system_dim) * (1 + (factor - 1) * mask)
+            ).reshape(rho.shape)
+
+
+def precision_drift(rho: np.ndarray) -> float:
+    """
+    Largest trace or hermiticity error of a density matrix (or stack).
+
+    Returns:
+        max(|Tr ρ - 1|, max_ij |ρ_ij - ρ_ji*|) over every member
+    """
+    trace_error = np.abs(np.trace(rho, axis1=-2, axis2=-1) - 1)
+    hermiticity_error = np.abs(rho - np.swapaxes(rho, -1, -2).conj())
+    return float(max(np.max(trace_error), np.max(hermiticity_error)))
+
+
+def iter_precision_guarded(owner, solve: Callable, rho0: np.ndarray,
+                           times: np.ndarray
+                           ) -> Iterator[Tuple[int, float, np.ndarray]]:
+    """
+    Outputs of `solve` with the single-precision drift guard applied.
+
+    While owner.params.dtype is not complex128, every output after the
+    first is checked with precision_drift. Once the drift exceeds
+    owner.params.precision_tolerance a RuntimeWarning is issued,
+    owner.precision_fallback is set to that time, owner._set_precision
+    switches to complex128 and the last interval is solved again from the
+    previous output. Outputs already yielded are not repeated.
+
+    Args:
+        owner: DIISimulation or DIIBatchSimulation being integrated
+        solve: solve(ρ0, times) yielding (t, ρ vector) at every time
+        rho0: Initial state; its shape is restored on every output
+        times: Output times
+
+    Yields:
+        (n, t, ρ) with n the index into `times` and ρ in the owner's dtype
+    """
+    start, resumed = 0, False
+    while True:
+        previous = None
+        for n, (t, rho_vec) in enumerate(solve(rho0, times[start:]), start):
+            if resumed and n == start:
+                continue  # already yielded before the precision switch
+            rho = rho_vec.reshape(rho0.shape)
+            params = owner.params
+            if (params.dtype != "complex128" and previous is not None
+                    and precision_drift(rho) > params.precision_tolerance):
+                warnings.warn(
+                    f"{params.dtype} drift exceeded precision_tolerance "
+                    f"at t={t:.4g}; continuing in complex128", RuntimeWarning)
+                owner.precision_fallback = t
+                owner._set_precision("complex128")
+                start, rho0 = n - 1, previous.astype(complex)
+                resumed = True
+                break
+            rho = rho.astype(params.dtype, copy=False)
+            previous = rho
+            yield n, t, rho
+        else:
+            return
+
+
+def rotate_pointer_blocks(kets: np.ndarray, pointer_matrix: np.ndarray,
+                          phase: float) -> np.ndarray:
+    """
+    Apply exp(-iφ Σ_k |k⟩⟨k|_S ⊗ |A_k⟩⟨A_k|_A) to block-form kets.
+
+    On system block k this is I + (e^{-iφ} - 1)|A_k⟩⟨A_k|; with φ = g t it
+    is exp(-iH t) for the interaction Hamiltonian.
+
+    Args:
+        kets: Shape (..., d_S, d_A); leading axes are independent states
+        pointer_matrix: Pointer states A_k as rows, shape (d_S, d_A)
+        phase: φ
+
+    Returns:
+        The rotated kets (a new array)
+    """
+    A = pointer_matrix
+    amplitudes = np.einsum('ka,...ka->...k', A.conj(), kets)
+    amplitudes *= complex(np.exp(-1j * phase) - 1)
+    return kets + amplitudes[..., None] * A
+
+
+def conjugate_pointer_blocks(rho_blocks: np.ndarray, pointer_matrix: np.ndarray,
+                             phase: float) -> np.ndarray:
+    """
+    U ρ U† for the rotation U of rotate_pointer_blocks.
+
+    Args:
+        rho_blocks: Block view of ρ, shape (d_S, d_A, d_S, d_A)
+        pointer_matrix: Pointer states A_k as rows, shape (d_S, d_A)
+        phase: φ
+
+    Returns:
+        U ρ U† in the same block layout
+    """
+    # U ρ acts on the row indices; ·U† on the columns is the same rotation
+    # with conjugated pointers and phase -φ
+    left = rotate_pointer_blocks(rho_blocks.transpose(2, 3, 0, 1),
+                                 pointer_matrix, phase).transpose(2, 3, 0, 1)
+    return rotate_pointer_blocks(left, pointer_matrix.conj(), -phase)
+
+
+def branch_information(rho_system: np.ndarray) -> np.ndarray:
+    """
+    Information I_k for each outcome branch from the system reduced state.
+
+    Args:
+        rho_system: System reduced density matrix, shape (..., d_S, d_S)
+
+    Returns:
+        Array of shape (..., d_S)
+    """
+    system_dim = rho_system.shape[-1]
+
+    # Information is related to off-diagonal coherence decay
+    # Simplification: I_k ∝ diagonal purity - full purity
+    # Full version would integrate current over spacetime
+
+    # Coherence loss for outcome k: how much the k-th diagonal
+    # element has "decohered" (row sums of |ρ_S| minus the diagonal)
+    diag = np.diagonal(rho_system, axis1=-2, axis2=-1).real
+    off_diag_sum = np.sum(np.abs(rho_system), axis=-1) - diag
+
+    # Information accumulation rate
+    return diag * (1 - off_diag_sum / (system_dim - 1 + 1e-10))
+
+
+def information_gap(information: np.ndarray) -> Tuple[float, int]:
+    """
+    Information gap ΔI = max(I_k) - max_{j≠k}(I_j) and the winning branch.
+
+    Args:
+        information: Array [I_0, I_1, ...] (or stack, shape (..., d_S))
+
+    Returns:
+        (gap, winning_index), arrays of shape (...) for stacked input
+    """
+    top_two = -np.partition(-information, 1, axis=-1)[..., :2]
+    gap = top_two[..., 0] - top_two[..., 1]
+    winner = np.argmax(information, axis=-1)
+
+    return gap, winner
+
+
+def select_outcome(amplitudes: np.ndarray, X_overlaps: np.ndarray):
+    """
+    Deterministic selection rule k = argmax_i (|c_i|² X_i).
+
+    Args:
+        amplitudes: System superposition amplitudes c_i
+        X_overlaps: Pointer overlaps X_i (or stack, shape (..., d_S))
+
+    Returns:
+        Outcome index k, an array of shape (...) for stacked overlaps
+    """
+    return np.argmax(np.abs(amplitudes)**2 * X_overlaps, axis=-1)
 
 
 @dataclass
@@ -50,6 +421,193 @@ class DIIParameters:
     # Random seed
     random_seed: Optional[int] = None
 
+    # How apparatus microstates are drawn:
+    # "state" - a full Haar-random vector of dimension apparatus_dim
+    # "analytic" - the joint overlaps X_i with the (basis) pointer states
+    #              directly from their Dirichlet marginal, O(system_dim) per
+    #              trial; a state is completed around them only if needed
+    overlap_sampler: str = "state"
+
+    # Exact reduced model: with basis pointer states only span{|A_k⟩} and
+    # the direction of the microstate orthogonal to it are ever occupied,
+    # so the apparatus is simulated in that (n_pointers + 1)-dimensional
+    # basis; observables of the system are unchanged
+    reduced_model: bool = False
+
+    # Pure-state-until-mixed: while 1 - Tr ρ² <= tolerance, evolve()
+    # carries the state vector and a scalar coherence factor (O(D) memory,
+    # see DephasedPureState) and only forms the D × D matrix once purity
+    # falls further. None always uses the density matrix
+    pure_state_tolerance: Optional[float] = None
+
+    # Information history: None keeps every output time, N keeps only the
+    # most recent N records (ring buffer)
+    history_length: Optional[int] = None
+
+    # Linear-algebra backend for the master equation right-hand side:
+    # "dense" - full D×D matrix products with H and P_k
+    # "block" - ρ as a d_S × d_S grid of apparatus blocks; dephasing and
+    #           collapse are block scalings, H acts per block (O(D²))
+    # "sparse" - H and P_k stored as scipy.sparse matrices; commutators
+    #           are sparse-dense products (memory O(nnz) instead of D²)
+    backend: str = "dense"
+
+    # Time integrator for evolve():
+    # "RK45", "DOP853", "RK23" - adaptive Runge-Kutta on complex ρ
+    # "odeint" - LSODA on the real/imaginary split of ρ
+    # "expm" - exact exponential of the Liouvillian in closed form, collapse
+    #          factor F held constant over each output interval dt
+    # "lowrank" - ρ = L L† with L of shape (D, r); see LowRankState
+    # "BDF"  - implicit, for large collapse/decoherence rates; sparse
+    #          analytic Jacobian L_lin + F L_collapse, F frozen at the
+    #          state where it is evaluated
+    # "auto" - RK45, switching to BDF when the steps become limited by
+    #          stability (rate γ + 2λF) rather than accuracy
+    # "strang" - second-order splitting into the exact unitary and
+    #          dephasing/collapse flows, with step-doubling error control
+    integrator: str = "RK45"
+    rtol: float = 1e-6  # Relative tolerance of the integrator
+    atol: float = 1e-9  # Absolute tolerance of the integrator
+
+    # Low-rank integrator: singular values of L are dropped while the
+    # discarded trace weight per step stays below rank_tolerance·Tr ρ;
+    # max_rank caps r regardless
+    rank_tolerance: float = 1e-12
+    max_rank: Optional[int] = None
+
+    # Interaction picture: with a diagonal H (basis pointer states) the
+    # unitary part is applied analytically as elementwise phases and only
+    # the dissipator is integrated (RK methods and "odeint")
+    interaction_picture: bool = False
+
+    # Early termination: evolve() stops at the first of these events
+    # "threshold" - information gap ΔI reaches Δ_crit
+    # "collapse" - collapse factor F reaches collapse_level
+    # "stationary" - ||dρ/dt||_F over an output interval falls below
+    #                stationary_tolerance
+    stop_events: Tuple[str, ...] = ()
+    collapse_level: float = 0.99
+    stationary_tolerance: float = 1e-8
+
+    # Precision of ρ, the operators and the master equation: "complex128"
+    # or "complex64" (half the memory traffic). Single-precision runs
+    # check trace and hermiticity drift at every output time and redo the
+    # last interval in complex128 once either exceeds precision_tolerance.
+    # The RK and odeint solvers keep their own state in double precision,
+    # so there only the RHS arithmetic runs in single precision (the state
+    # is cast into one reused buffer per call); the factored ("pure",
+    # "lowrank") paths always run in double.
+    dtype: str = "complex128"
+    precision_tolerance: float = 1e-4
+
+
+def _system_state(rho: np.ndarray, system_dim: int) -> np.ndarray:
+    if isinstance(rho, _FACTORED_STATES):
+        return rho.system_state()
+    return partial_trace(rho, (system_dim, rho.shape[-1] // system_dim), keep=(0,))
+
+
+def _observe_populations(rho: np.ndarray, system_dim: int) -> np.ndarray:
+    rho_system = _system_state(rho, system_dim)
+    return np.diagonal(rho_system, axis1=-2, axis2=-1).real
+
+
+def _observe_coherences(rho: np.ndarray, system_dim: int) -> np.ndarray:
+    rows, cols = np.triu_indices(system_dim, k=1)
+    return _system_state(rho, system_dim)[..., rows, cols]
+
+
+def _observe_purity(rho: np.ndarray, system_dim: int) -> float:
+    if isinstance(rho, _FACTORED_STATES):
+        return rho.purity()
+    # Tr(ρ²) = Σ_ij |ρ_ij|² for Hermitian ρ, without forming ρ @ ρ
+    return np.sum(np.abs(rho)**2, axis=(-2, -1))
+
+
+def _observe_trace(rho: np.ndarray, system_dim: int) -> complex:
+    if isinstance(rho, _FACTORED_STATES):
+        return rho.trace()
+    return np.trace(rho, axis1=-2, axis2=-1)
+
+
+def _observe_information_gap(rho: np.ndarray, system_dim: int) -> float:
+    gap, _ = information_gap(branch_information(_system_state(rho, system_dim)))
+    return gap
+
+
+# Built-in observables for DIISimulation.evolve(observables=[...]).
+# Each maps (ρ, system_dim) to a value; custom observables are callables
+# f(t, ρ) passed directly in the list.
+OBSERVABLES = {
+    "populations": _observe_populations,
+    "coherences": _observe_coherences,
+    "purity": _observe_purity,
+    "trace": _observe_trace,
+    "information_gap": _observe_information_gap,
+}
+
+
+def resolve_observables(observables: Sequence, system_dim: int,
+                        stacked: bool = False) -> List[Tuple[str, Callable]]:
+    """
+    Map observable names/callables to (name, f(t, ρ)) pairs.
+
+    With stacked=True ρ is a (B, D, D) stack: built-in names are
+    evaluated on the whole stack, callables once per member.
+    """
+    evaluators = []
+
+    for obs in observables:
+        if callable(obs):
+            name = getattr(obs, "__name__", repr(obs))
+            if stacked:
+                obs = lambda t, rho, f=obs: np.array([f(t, r) for r in rho])
+            evaluators.append((name, obs))
+        elif obs in OBSERVABLES:
+            fn = OBSERVABLES[obs]
+            evaluators.append((obs, lambda t, rho, fn=fn: fn(rho, system_dim)))
+        else:
+            raise ValueError(
+                f"Unknown observable {obs!r}; expected a callable or one "
+                f"of {tuple(OBSERVABLES)}"
+            )
+
+    return evaluators
+
+
+def collect_outputs(outputs: Iterator[Tuple[float, np.ndarray]],
+                    evaluators: Optional[List[Tuple[str, Callable]]],
+                    row_shape: tuple = (-1,)) -> Tuple[np.ndarray, object, object]:
+    """
+    Consume an evolution stream, keeping either ρ or observable values.
+
+    Args:
+        outputs: (t, ρ) pairs, e.g. from iter_evolution
+        evaluators: From resolve_observables, or None to keep every ρ
+            reshaped to `row_shape`
+        row_shape: Shape of one stored ρ row
+
+    Returns:
+        (times, trajectory or {name: values}, last ρ); arrays are indexed
+        by output time first
+    """
+    times = []
+    trajectory = []
+    values = {name: [] for name, _ in evaluators or []}
+    rho = None
+
+    for t, rho in outputs:
+        times.append(t)
+        if evaluators is None:
+            trajectory.append(np.asarray(rho).reshape(row_shape))
+        else:
+            for name, evaluate in evaluators:
+                values[name].append(evaluate(t, rho))
+
+    if evaluators is None:
+        return np.array(times), np.array(trajectory), rho
+    return np.array(times), {name: np.array(v) for name, v in values.items()}, rho
+
 
 class ApparatusMicrostate:
     """
@@ -58,8 +616,8 @@ class ApparatusMicrostate:
     Key insight: The apparatus has ~10^23 degrees of freedom with thermal
     fluctuations leading to run-to-run variation in |ψ_A^micro⟩.
 
-    For simulation, we use N-dimensional Hilbert space with random phases
-    representing thermal randomness.
+    For simulation, we use N-dimensional Hilbert space with Haar-random
+    states representing thermal randomness.
     """
 
     def __init__(self, dim: int, seed: Optional[int] = None):
@@ -74,6 +632,9 @@ class ApparatusMicrostate:
         self.rng = np.random.default_rng(seed)
         self._state = None
         self._overlaps = None
+        # Joint basis overlaps drawn ahead of the state (analytic sampler);
+        # the state is then completed around them
+        self.pointer_overlaps = None
 
     def sample_thermal_state(self) -> np.ndarray:
         """
@@ -87,29 +648,92 @@ class ApparatusMicrostate:
         Returns:
             Complex vector of dimension dim (normalized)
         """
-        # Random phases (uniform on [0, 2π))
-        phases = self.rng.uniform(0, 2*np.pi, self.dim)
+        self._state = self.sample_thermal_states(1)[0]
+        return self._state
 
-        # Equal amplitude superposition with random phases
-        # This approximates Haar-random distribution for large dim
-        state = np.exp(1j * phases) / np.sqrt(self.dim)
+    def sample_thermal_states(self, n: int) -> np.ndarray:
+        """
+        Sample n independent Haar-random microstates in one draw.
 
-        # For higher accuracy, use Ginibre ensemble
-        # (Gaussian random complex numbers normalized)
-        real_part = self.rng.normal(0, 1, self.dim)
-        imag_part = self.rng.normal(0, 1, self.dim)
-        state = (real_part + 1j * imag_part)
-        state = state / np.linalg.norm(state)
+        Uses the Ginibre construction (i.i.d. complex Gaussian entries,
+        normalized). Row i consumes the same draws as the i-th of n
+        consecutive sample_thermal_state() calls, so both give identical
+        states from the same Generator. The current state is not changed.
 
-        self._state = state
+        Args:
+            n: Number of microstates
+
+        Returns:
+            (n, dim) complex array with normalized rows
+        """
+        z = self.rng.standard_normal((n, 2, self.dim))
+        states = z[:, 0] + 1j * z[:, 1]
+        states /= np.linalg.norm(states, axis=1, keepdims=True)
+        return states
+
+    def sample_basis_overlaps(self, n: int, indices: Sequence[int]) -> np.ndarray:
+        """
+        Sample X_j = |⟨j|ψ⟩|² for basis vectors |j⟩ without drawing ψ.
+
+        For Haar-random ψ the vector of all dim basis overlaps is
+        Dirichlet(1, ..., 1), so the m distinct requested overlaps and
+        their remainder are Dirichlet(1, ..., 1, dim - m): normalized
+        Exp(1) draws plus one Gamma(dim - m) draw. Exact for any dim, at
+        O(m) cost per sample.
+
+        Args:
+            n: Number of microstates
+            indices: Basis indices j (repeats give equal overlaps)
+
+        Returns:
+            (n, len(indices)) array of joint overlaps
+        """
+        distinct, inverse = np.unique(np.asarray(indices), return_inverse=True)
+        m = len(distinct)
+
+        weights = self.rng.standard_exponential((n, m))
+        rest = self.rng.standard_gamma(self.dim - m, n) if self.dim > m else 0.0
+        overlaps = weights / (weights.sum(axis=1) + rest)[:, None]
+        return overlaps[:, inverse]
+
+    def sample_state_with_overlaps(self, overlaps: np.ndarray,
+                                   indices: Sequence[int]) -> np.ndarray:
+        """
+        Haar-random state conditioned on its basis overlaps.
+
+        Components j in `indices` get modulus √X_j and uniform phases; the
+        remaining weight 1 - ΣX_j is spread as a Haar-random vector over
+        the other basis states. With overlaps from sample_basis_overlaps the
+        result is distributed exactly as sample_thermal_state().
+
+        Args:
+            overlaps: X_j for each entry of `indices`
+            indices: Basis indices j
+
+        Returns:
+            Complex vector of dimension dim (normalized)
+        """
+        distinct, first = np.unique(np.asarray(indices), return_index=True)
+        overlaps = np.asarray(overlaps)[first]
+
+        z = self.rng.standard_normal((2, self.dim))
+        state = z[0] + 1j * z[1]
+        state[distinct] = 0.0
+        norm = np.linalg.norm(state)
+        if norm > 0:
+            state *= np.sqrt(max(1.0 - overlaps.sum(), 0.0)) / norm
+
+        phases = self.rng.uniform(0, 2*np.pi, len(distinct))
+        state[distinct] = np.sqrt(overlaps) * np.exp(1j * phases)
         return state
 
-    def compute_overlaps(self, pointer_states: List[np.ndarray]) -> np.ndarray:
+    def compute_overlaps(self, pointer_states: Sequence[np.ndarray]) -> np.ndarray:
         """
         Compute X_i = |⟨A_i|ψ_A^micro⟩|² for each pointer state.
 
         Args:
-            pointer_states: List of apparatus pointer states |A_i⟩
+            pointer_states: Apparatus pointer states |A_i⟩ (a list of
+                vectors or a (k, dim) array with one state per row)
 
         Returns:
             Array of overlap squared magnitudes
@@ -117,10 +741,8 @@ class ApparatusMicrostate:
         if self._state is None:
             raise ValueError("Must sample thermal state first")
 
-        overlaps = np.array([
-            np.abs(np.vdot(pointer, self._state))**2
-            for pointer in pointer_states
-        ])
+        # All ⟨A_i|ψ⟩ as one matrix-vector product
+        overlaps = np.abs(np.asarray(pointer_states).conj() @ self._state)**2
 
         self._overlaps = overlaps
         return overlaps
@@ -130,12 +752,100 @@ class ApparatusMicrostate:
         """Current apparatus microstate."""
         return self._state
 
+    @state.setter
+    def state(self, state: np.ndarray):
+        self._state = state
+        self._overlaps = None
+
     @property
     def overlaps(self) -> Optional[np.ndarray]:
         """Cached pointer state overlaps."""
         return self._overlaps
 
 
+class InformationHistory:
+    """
+    Record of I_k(t) at output times, stored in preallocated arrays.
+
+    Grows by doubling, or with ring=True keeps only the most recent
+    `capacity` records. Iterating yields (t, information) pairs in
+    chronological order.
+    """
+
+    def __init__(self, n_branches: int, capacity: int = 256, ring: bool = False):
+        self.ring = ring
+        self._times = np.empty(capacity)
+        self._values = np.empty((capacity, n_branches))
+        self._count = 0  # total records appended
+
+    def append(self, t: float, information: np.ndarray):
+        """Append one record (copied into the buffer)."""
+        capacity = len(self._times)
+
+        if self._count >= capacity and not self.ring:
+            self._times = np.concatenate([self._times, np.empty(capacity)])
+            self._values = np.concatenate([self._values, np.empty_like(self._values)])
+            capacity *= 2
+
+        slot = self._count % capacity
+        self._times[slot] = t
+        self._values[slot] = information
+        self._count += 1
+
+    def clear(self):
+        """Drop all records, keeping the buffers."""
+        self._count = 0
+
+    @classmethod
+    def for_run(cls, params: "DIIParameters") -> "InformationHistory":
+        """
+        History for one run: a ring of params.history_length records, or
+        room for every output time when that is None.
+        """
+        if params.history_length is not None:
+            if params.history_length < 1:
+                raise ValueError(
+                    f"history_length must be >= 1 or None, got {params.history_length}"
+                )
+            return cls(params.system_dim, capacity=params.history_length,
+                       ring=True)
+        n_outputs = int(np.ceil(params.t_final / params.dt)) + 1
+        return cls(params.system_dim, capacity=max(n_outputs, 1))
+
+    @classmethod
+    def from_arrays(cls, times: np.ndarray,
+                    values: np.ndarray) -> "InformationHistory":
+        """Rebuild a history from its times and values arrays."""
+        history = cls(values.shape[1], capacity=max(len(times), 1))
+        history._times[:len(times)] = times
+        history._values[:len(times)] = values
+        history._count = len(times)
+        return history
+
+    def _chronological(self, buffer: np.ndarray) -> np.ndarray:
+        # View while the buffer has not wrapped, reordered copy after
+        capacity = len(self._times)
+        if self._count <= capacity:
+            return buffer[:self._count]
+        return np.roll(buffer, -(self._count % capacity), axis=0)
+
+    @property
+    def times(self) -> np.ndarray:
+        """Record times, oldest first."""
+        return self._chronological(self._times)
+
+    @property
+    def values(self) -> np.ndarray:
+        """Information values, shape (len(self), n_branches), oldest first."""
+        return self._chronological(self._values)
+
+    def __len__(self) -> int:
+        return min(self._count, len(self._times))
+
+    def __iter__(self):
+        return zip(self.times, self.values)
+
+
 class InformationFunctional:
     """
     Compute information integration functional I_k(t).
@@ -149,73 +859,89 @@ class InformationFunctional:
 
     def __init__(self, params: DIIParameters):
         self.params = params
-        self.history = []  # Track I_k(t) over time
+
+        # Track I_k(t) at output times (not at every RHS evaluation)
+        self.history = InformationHistory.for_run(params)
+
+        # Most recently computed I_k, used for the collapse factor
+        self._current = np.zeros(params.system_dim)
+        self._has_current = False
 
     def compute(self, rho_full: np.ndarray, t: float) -> np.ndarray:
         """
         Compute information functional for each outcome branch.
 
         Args:
-            rho_full: Full density matrix (system ⊗ apparatus)
+            rho_full: Full density matrix (system ⊗ apparatus), or a stack
+                of them with shape (..., D, D)
             t: Current time
 
         Returns:
-            Array [I_0(t), I_1(t), ...] for each outcome
+            Array [I_0(t), I_1(t), ...] for each outcome (shape (..., system_dim))
         """
         system_dim = self.params.system_dim
 
         # Trace out apparatus to get system reduced density matrix
         rho_system = self._partial_trace_apparatus(rho_full, system_dim)
 
-        # Information is related to off-diagonal coherence decay
-        # Simplification: I_k ∝ diagonal purity - full purity
-        # Full version would integrate current over spacetime
+        return self.compute_reduced(rho_system, t)
 
-        information = np.zeros(system_dim)
+    def compute_reduced(self, rho_system: np.ndarray, t: float) -> np.ndarray:
+        """
+        Compute the information functional from the system reduced state.
 
-        for k in range(system_dim):
-            # Coherence loss for outcome k
-            # Measure how much k-th diagonal element has "decohered"
-            diag_k = rho_system[k, k].real
+        Used directly by engines that never form the full density matrix.
 
-            # Accumulate information based on decoherence
-            # I_k grows as coherence is destroyed
-            off_diag_sum = np.sum(np.abs(rho_system[k, :])) - diag_k
+        Args:
+            rho_system: System reduced density matrix, shape (..., d_S, d_S)
+            t: Current time
 
-            # Information accumulation rate
-            information[k] = diag_k * (1 - off_diag_sum / (system_dim - 1 + 1e-10))
+        Returns:
+            Array [I_0(t), I_1(t), ...] for each outcome
+        """
+        information = branch_information(rho_system)
 
-        # Store history
-        self.history.append((t, information.copy()))
+        # Single states become the current value for get_information_gap;
+        # stacks are handled by the batched engines themselves
+        if information.ndim == 1:
+            self._current[:] = information
+            self._has_current = True
 
         return information
 
+    def record(self, t: float, information: Optional[np.ndarray] = None):
+        """
+        Store I_k(t) in the history.
+
+        Called by the integration loop at output times only, so solver
+        stage evaluations never reach the history.
+
+        Args:
+            t: Time of the record
+            information: Values to record; defaults to the most recently
+                computed ones (and otherwise becomes the current value)
+        """
+        if information is not None:
+            self._current[:] = information
+            self._has_current = True
+        self.history.append(t, self._current)
+
     def _partial_trace_apparatus(self, rho_full: np.ndarray,
                                    system_dim: int) -> np.ndarray:
         """
         Trace out apparatus degrees of freedom.
 
         Args:
-            rho_full: Full density matrix
+            rho_full: Full density matrix (or stack of them)
             system_dim: System Hilbert space dimension
 
         Returns:
             System reduced density matrix
         """
-        total_dim = rho_full.shape[0]
+        total_dim = rho_full.shape[-1]
         apparatus_dim = total_dim // system_dim
 
-        rho_system = np.zeros((system_dim, system_dim), dtype=complex)
-
-        for i in range(system_dim):
-            for j in range(system_dim):
-                # Sum over apparatus indices
-                for k in range(apparatus_dim):
-                    idx_i = i * apparatus_dim + k
-                    idx_j = j * apparatus_dim + k
-                    rho_system[i, j] += rho_full[idx_i, idx_j]
-
-        return rho_system
+        return partial_trace(rho_full, (system_dim, apparatus_dim), keep=(0,))
 
     def get_information_gap(self) -> Tuple[float, int]:
         """
@@ -224,16 +950,10 @@ class InformationFunctional:
         Returns:
             (gap, winning_index)
         """
-        if not self.history:
+        if not self._has_current:
             return 0.0, 0
 
-        _, info = self.history[-1]
-        sorted_info = np.sort(info)[::-1]
-
-        gap = sorted_info[0] - sorted_info[1]
-        winner = np.argmax(info)
-
-        return gap, winner
+        return information_gap(self._current)
 
 
 class CollapseDynamics:
@@ -267,6 +987,11 @@ class CollapseDynamics:
         """
         return np.tanh(delta_I / self.params.threshold)
 
+    def current_factor(self) -> float:
+        """F for the information last computed by the information functional."""
+        delta_I, _ = self.info_func.get_information_gap()
+        return self.collapse_functional(delta_I)
+
     def lindblad_collapse_term(self, rho: np.ndarray,
                                 projectors: List[np.ndarray]) -> np.ndarray:
         """
@@ -279,14 +1004,11 @@ class CollapseDynamics:
         Returns:
             Collapse contribution to dρ/dt
         """
-        # Get current information gap
-        delta_I, winner = self.info_func.get_information_gap()
-
-        # Collapse functional
-        F = self.collapse_functional(delta_I)
+        # Collapse functional of the current information gap
+        F = self.current_factor()
 
         # Lindblad term: Σ_k F (P_k ρ + ρ P_k - 2 P_k ρ P_k)
-        collapse_term = np.zeros_like(rho, dtype=complex)
+        collapse_term = np.zeros_like(rho, dtype=np.result_type(rho, np.complex64))
 
         for k, P_k in enumerate(projectors):
             # Lindblad dissipator form
@@ -294,128 +1016,646 @@ class CollapseDynamics:
             # Simplified: P_k ρ + ρ P_k - 2 P_k ρ P_k
 
             term = P_k @ rho + rho @ P_k - 2 * P_k @ rho @ P_k
-            collapse_term += F * term
+            collapse_term += float(F) * term
 
         collapse_term *= -self.params.collapse_rate
 
         return collapse_term
 
+    def block_collapse_term(self, rho_blocks: np.ndarray) -> np.ndarray:
+        """
+        Collapse term for projectors P_k = |k⟩⟨k|_S ⊗ I_A in block form.
+
+        For these projectors Σ_k (P_k ρ + ρ P_k - 2 P_k ρ P_k) leaves the
+        diagonal blocks untouched and doubles the off-diagonal ones, so
+        the collapse term is a scaling of the off-diagonal blocks.
 
-class DIISimulation:
+        Args:
+            rho_blocks: Block view of ρ, shape (..., d_S, d_A, d_S, d_A)
+
+        Returns:
+            Collapse contribution to dρ/dt, in the same block layout
+        """
+        F = self.current_factor()
+
+        mask = offdiagonal_block_mask(rho_blocks.shape[-4], rho_blocks.real.dtype)
+        return (-2.0 * self.params.collapse_rate * float(F)) * (mask * rho_blocks)
+
+
+class DephasedPureState:
     """
-    Main simulation class for DII quantum measurement.
+    ρ = c |ψ⟩⟨ψ| + (1 - c) Σ_k P_k |ψ⟩⟨ψ| P_k, stored as ψ and c.
 
-    Integrates master equation:
-    dρ/dt = -i/ℏ[H,ρ] + L_deco[ρ] + L_collapse[ρ]
+    H_int is block diagonal in the system basis, so it commutes with the
+    dephasing and collapse channels, which only scale the off-diagonal
+    system blocks of ρ by c = exp(-∫(γ + 2λF) dt). Starting from a pure
+    product state, ρ(t) is therefore exactly this form with ψ(t) evolved
+    unitarily: O(D) memory instead of O(D²).
+
+    Stands in for the density matrix in observables and information
+    tracking; np.asarray(state) forms the full (D, D) matrix.
     """
 
-    def __init__(self, params: DIIParameters):
-        self.params = params
-        self.apparatus = ApparatusMicrostate(params.apparatus_dim, params.random_seed)
-        self.info_func = InformationFunctional(params)
-        self.collapse = CollapseDynamics(params, self.info_func)
+    def __init__(self, psi: np.ndarray, coherence: float):
+        """
+        Args:
+            psi: (d_S, d_A) block state vector (row k is P_k|ψ⟩)
+            coherence: Off-diagonal block factor c ∈ [0, 1]
+        """
+        self.psi = psi
+        self.coherence = coherence
 
-        # Initialize system
-        self._setup_system()
+    @property
+    def shape(self) -> Tuple[int, int]:
+        dim = self.psi.size
+        return (dim, dim)
+
+    def system_state(self) -> np.ndarray:
+        """ρ_S[k, j] = w_kj ⟨ψ_j|ψ_k⟩ with w = 1 on the diagonal, c off it."""
+        gram = self.psi @ self.psi.conj().T
+        weights = np.full(gram.shape, self.coherence)
+        np.fill_diagonal(weights, 1.0)
+        return weights * gram
+
+    def purity(self) -> float:
+        """Tr ρ² = c² + (1 - c²) Σ_k p_k², with p_k = ||P_k ψ||²."""
+        p = np.sum(np.abs(self.psi)**2, axis=1)
+        c2 = self.coherence**2
+        return c2 * np.sum(p)**2 + (1 - c2) * np.sum(p**2)
+
+    def trace(self) -> complex:
+        return complex(np.vdot(self.psi, self.psi))
+
+    def to_density_matrix(self) -> np.ndarray:
+        """Full (D, D) density matrix."""
+        psi = self.psi.reshape(-1)
+        rho = self.coherence * np.outer(psi, psi.conj())
+        blocks = system_blocks(rho, self.psi.shape[0])
+        for k, psi_k in enumerate(self.psi):
+            blocks[k, :, k, :] = np.outer(psi_k, psi_k.conj())
+        return rho
 
-    def _setup_system(self):
-        """Initialize quantum system components."""
-        # System initial state: |+⟩ = (|0⟩ + |1⟩)/√2
-        d_sys = self.params.system_dim
-        psi_sys = np.ones(d_sys, dtype=complex) / np.sqrt(d_sys)
+    @property
+    def factor(self) -> np.ndarray:
+        """L with ρ = L L†, as (d_S, d_A, d_S + 1) blocks."""
+        return _dephasing_kraus_factor(self.psi[:, :, None], self.coherence)
 
-        # Apparatus pointer states (orthonormal basis)
-        d_app = self.params.apparatus_dim
-        self.pointer_states = [
-            self._create_pointer_state(k, d_app)
-            for k in range(d_sys)
-        ]
+    def __array__(self, dtype=None, copy=None):
+        rho = self.to_density_matrix()
+        return rho if dtype is None else rho.astype(dtype)
 
-        # Sample apparatus microstate
-        self.apparatus.sample_thermal_state()
 
-        # Compute overlaps X_i
-        self.X_overlaps = self.apparatus.compute_overlaps(self.pointer_states)
+def _dephasing_kraus_factor(factor: np.ndarray, coherence: float) -> np.ndarray:
+    """
+    Apply ρ -> c ρ + (1 - c) Σ_k P_k ρ P_k to ρ = L L†.
 
-        # Initial density matrix: |ψ_S⟩⟨ψ_S| ⊗ |ψ_A⟩⟨ψ_A|
-        rho_sys = np.outer(psi_sys, psi_sys.conj())
-        rho_app = np.outer(self.apparatus.state, self.apparatus.state.conj())
-        self.rho_initial = np.kron(rho_sys, rho_app)
+    The channel has Kraus operators √c I and √(1-c) P_k, so the new factor
+    is [√c L, √(1-c) P_1 L, ..., √(1-c) P_d L]; P_k L keeps only block k.
 
-        # Interaction Hamiltonian
-        self._build_hamiltonian()
+    Args:
+        factor: L as (d_S, d_A, r) blocks
+        coherence: c
 
-        # Projectors for collapse
-        self.projectors = self._build_projectors()
+    Returns:
+        (d_S, d_A, r (d_S + 1)) factor
+    """
+    d_sys = factor.shape[0]
+    pieces = [np.sqrt(coherence) * factor]
+    for k in range(d_sys):
+        piece = np.zeros_like(factor)
+        piece[k] = np.sqrt(1 - coherence) * factor[k]
+        pieces.append(piece)
+    return np.concatenate(pieces, axis=2)
 
-    def _create_pointer_state(self, k: int, dim: int) -> np.ndarray:
-        """Create k-th apparatus pointer state."""
-        state = np.zeros(dim, dtype=complex)
-        # Simple model: pointer states are basis states
-        # More realistic: coherent states separated in phase space
-        state[k % dim] = 1.0
-        return state
 
-    def _build_hamiltonian(self):
-        """
-        Build interaction Hamiltonian.
+class LowRankState:
+    """
+    Density matrix stored as a factor, ρ = L L† with L of shape (D, r).
 
-        H_int = g Σ_k |k⟩⟨k|_S ⊗ A_k
+    Memory is O(D·r) and the system state, purity and trace cost O(D·r²);
+    stands in for the density matrix like DephasedPureState.
+    """
 
-        where A_k are apparatus operators coupling to pointer states.
+    def __init__(self, factor: np.ndarray):
         """
-        d_sys = self.params.system_dim
-        d_app = self.params.apparatus_dim
-        g = self.params.coupling_strength
+        Args:
+            factor: L as (d_S, d_A, r) blocks
+        """
+        self.factor = factor
 
-        # For simplicity: H_int = g Σ_k |k⟩⟨k|_S ⊗ |A_k⟩⟨A_k|_A
-        H = np.zeros((d_sys * d_app, d_sys * d_app), dtype=complex)
+    @property
+    def rank(self) -> int:
+        return self.factor.shape[2]
 
-        for k in range(min(d_sys, len(self.pointer_states))):
-            # System projector
-            P_sys = np.zeros((d_sys, d_sys))
-            P_sys[k, k] = 1.0
+    @property
+    def shape(self) -> Tuple[int, int]:
+        dim = self.factor.shape[0] * self.factor.shape[1]
+        return (dim, dim)
 
-            # Apparatus projector
-            P_app = np.outer(self.pointer_states[k],
-                           self.pointer_states[k].conj())
+    def system_state(self) -> np.ndarray:
+        """ρ_S[k, j] = Σ_{a,m} L[k,a,m] L*[j,a,m]."""
+        return np.einsum('kam,jam->kj', self.factor, self.factor.conj())
 
-            # Tensor product
-            H += g * np.kron(P_sys, P_app)
+    def purity(self) -> float:
+        """Tr ρ² = ||L† L||_F²."""
+        L = self.factor.reshape(-1, self.rank)
+        return np.sum(np.abs(L.conj().T @ L)**2)
 
-        self.hamiltonian = H
+    def trace(self) -> complex:
+        return complex(np.vdot(self.factor, self.factor))
 
-    def _build_projectors(self) -> List[np.ndarray]:
-        """Build projection operators for each outcome."""
-        d_sys = self.params.system_dim
-        d_app = self.params.apparatus_dim
+    def to_density_matrix(self) -> np.ndarray:
+        """Full (D, D) density matrix."""
+        L = self.factor.reshape(-1, self.rank)
+        return L @ L.conj().T
 
-        projectors = []
-        for k in range(d_sys):
-            # System projector |k⟩⟨k|
-            P_sys = np.zeros((d_sys, d_sys))
-            P_sys[k, k] = 1.0
+    def __array__(self, dtype=None, copy=None):
+        rho = self.to_density_matrix()
+        return rho if dtype is None else rho.astype(dtype)
 
-            # Full projector (identity on apparatus)
-            P_full = np.kron(P_sys, np.eye(d_app))
-            projectors.append(P_full)
 
-        return projectors
+# States that stand in for a (D, D) density matrix
+_FACTORED_STATES = (DephasedPureState, LowRankState)
 
-    def master_equation(self, rho_vec: np.ndarray, t: float) -> np.ndarray:
-        """
-        Master equation: dρ/dt = -i/ℏ[H,ρ] + L_deco + L_collapse.
 
-        Args:
-            rho_vec: Vectorized density matrix
-            t: Current time
+def _frobenius_distance(rho_a, rho_b) -> float:
+    """||ρ_a - ρ_b||_F, via the factors when both states are factored."""
+    if not (isinstance(rho_a, _FACTORED_STATES) and isinstance(rho_b, _FACTORED_STATES)):
+        return float(np.linalg.norm(np.asarray(rho_a) - np.asarray(rho_b)))
 
-        Returns:
-            dρ/dt (vectorized)
-        """
-        # Reshape to matrix
+    # ||A A† - B B†||² = ||A†A||² + ||B†B||² - 2||A†B||², all r × r
+    A = rho_a.factor.reshape(-1, rho_a.factor.shape[2])
+    B = rho_b.factor.reshape(-1, rho_b.factor.shape[2])
+    squared = (np.sum(np.abs(A.conj().T @ A)**2) + np.sum(np.abs(B.conj().T @ B)**2)
+               - 2 * np.sum(np.abs(A.conj().T @ B)**2))
+    return float(np.sqrt(max(squared, 0.0)))
+
+
+def truncate_factor(factor: np.ndarray, tolerance: float,
+                    max_rank: Optional[int] = None) -> Tuple[np.ndarray, float]:
+    """
+    Compress ρ = L L† to the smallest rank within a trace-weight tolerance.
+
+    L = Q R (economy QR, O(D·r²)), then R = U S V† gives L L† = (Q U S)(Q U S)†
+    with the eigenvalues of ρ equal to s². The smallest s² are dropped while
+    their sum stays below tolerance · Tr ρ (and r <= max_rank).
+
+    Args:
+        factor: L as (d_S, d_A, r) blocks
+        tolerance: Relative trace weight that may be discarded
+        max_rank: Upper bound on the kept rank
+
+    Returns:
+        (compressed factor, discarded trace weight)
+    """
+    d_sys, d_app, rank = factor.shape
+    L = factor.reshape(-1, rank)
+    Q, R = np.linalg.qr(L)
+    U, s, _ = np.linalg.svd(R)
+
+    weights = s**2
+    total = np.sum(weights)
+    # discarded[i] = weight of the singular values after index i
+    discarded = total - np.cumsum(weights)
+    keep = int(np.argmax(discarded <= tolerance * total)) + 1
+    if max_rank is not None:
+        keep = min(keep, max_rank)
+
+    compressed = (Q @ U[:, :keep]) * s[:keep]
+    return compressed.reshape(d_sys, d_app, keep), float(np.sum(weights[keep:]))
+
+
+def _operator_nbytes(op) -> int:
+    """Memory held by a dense or scipy.sparse operator."""
+    if sparse.issparse(op):
+        op = op.tocsr()
+        return op.data.nbytes + op.indices.nbytes + op.indptr.nbytes
+    return np.asarray(op).nbytes
+
+
+class OperatorCache:
+    """
+    LRU cache of the parameter-independent operators of a DIISimulation.
+
+    Pointer states, H_int and the outcome projectors depend only on
+    (system_dim, apparatus_dim, coupling_strength) and on their storage
+    ("dense", "sparse", or "block" with the pointer states alone), not on
+    the apparatus microstate or the rates.
+    Simulations with the same key share one set of operators; dense arrays
+    are marked read-only so a shared entry cannot be modified in place.
+
+    Entries are evicted least recently used first once their total size
+    exceeds `max_bytes`. An entry larger than `max_bytes` is built but not
+    stored.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 2**20):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (operators, nbytes)
+
+    @staticmethod
+    def key(params: DIIParameters, storage: Optional[str] = None) -> tuple:
+        """Cache key of the operators for `params` (storage defaults to the backend)."""
+        storage = storage or params.backend
+        return (params.system_dim, params.apparatus_dim,
+                params.coupling_strength, storage, params.dtype)
+
+    def get(self, key: tuple, build: Callable[[], dict]) -> dict:
+        """
+        Operators for `key`, calling `build()` on a miss.
+
+        Args:
+            key: See OperatorCache.key
+            build: Returns a dict of operators (arrays or lists of arrays)
+
+        Returns:
+            The shared operator dict
+        """
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+        self.misses += 1
+        operators = build()
+        size = 0
+        for value in operators.values():
+            for op in (value if isinstance(value, list) else [value]):
+                if isinstance(op, np.ndarray):
+                    op.setflags(write=False)
+                size += _operator_nbytes(op)
+
+        if size <= self.max_bytes:
+            self._entries[key] = (operators, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+        return operators
+
+    def clear(self):
+        """Drop every entry."""
+        self._entries.clear()
+        self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self._entries
+
+
+# Shared by every DIISimulation unless another cache is passed
+OPERATOR_CACHE = OperatorCache()
+
+
+class DIISimulation:
+    """
+    Main simulation class for DII quantum measurement.
+
+    Integrates master equation:
+    dρ/dt = -i/ℏ[H,ρ] + L_deco[ρ] + L_collapse[ρ]
+    """
+
+    BACKENDS = ("dense", "block", "sparse")
+    OVERLAP_SAMPLERS = ("state", "analytic")
+    STOP_EVENTS = ("threshold", "collapse", "stationary")
+    DTYPES = ("complex128", "complex64")
+
+    def __init__(self, params: DIIParameters,
+                 apparatus: Optional[ApparatusMicrostate] = None,
+                 operator_cache: Optional[OperatorCache] = OPERATOR_CACHE):
+        """
+        Args:
+            params: Simulation parameters
+            apparatus: Apparatus microstate to measure with; by default a
+                new one is seeded from params.random_seed. An already
+                sampled microstate is used as is.
+            operator_cache: Where to look up pointer states, H_int and the
+                projectors (shared across simulations by default); None
+                builds private copies
+        """
+        if params.backend not in self.BACKENDS:
+            raise ValueError(
+                f"Unknown backend {params.backend!r}; expected one of {self.BACKENDS}"
+            )
+        if params.dtype not in self.DTYPES:
+            raise ValueError(
+                f"Unknown dtype {params.dtype!r}; expected one of {self.DTYPES}"
+            )
+        self._check_overlap_sampler(params)
+        self.operator_cache = operator_cache
+        self.apparatus = apparatus if apparatus is not None else \
+            ApparatusMicrostate(params.apparatus_dim, params.random_seed)
+        if params.reduced_model:
+            # self.params then describes the reduced apparatus
+            params, self.apparatus = self._reduce_model(params, self.apparatus)
+        self.params = params
+        self.info_func = InformationFunctional(params)
+        self.collapse = CollapseDynamics(params, self.info_func)
+        # Buffers and operators derived on first use (see _set_precision)
+        self._rhs_input = None  # single-precision copy of the solver state
+        self._rhs_workspace = None
+        self._liouvillian = None
+
+        # Initialize system
+        self._setup_system()
+
+    def _setup_system(self):
+        """Initialize quantum system components."""
+        # System initial state: |+⟩ = (|0⟩ + |1⟩)/√2
+        d_sys = self.params.system_dim
+        psi_sys = np.ones(d_sys, dtype=complex) / np.sqrt(d_sys)
+
+        # Microstate-independent operators, shared through the cache
+        self._load_operators()
+
+        # Sample apparatus microstate (unless one was supplied)
+        if self.apparatus.state is None:
+            self._sample_apparatus(self.apparatus, self.params)
+
+        # Compute overlaps X_i
+        self.X_overlaps = self.apparatus.compute_overlaps(self.pointer_states)
+
+        # Initial state |ψ_S⟩ ⊗ |ψ_A⟩ as a (d_S, d_A) block array; the
+        # D × D density matrix is only formed when rho_initial is used
+        self.psi_initial = np.outer(psi_sys, self.apparatus.state)
+        self._rho_initial = None
+
+    @property
+    def rho_initial(self) -> np.ndarray:
+        """Initial density matrix |ψ_S⟩⟨ψ_S| ⊗ |ψ_A⟩⟨ψ_A| (built on first use)."""
+        if self._rho_initial is None:
+            psi = self.psi_initial.reshape(-1).astype(self.params.dtype)
+            self._rho_initial = np.outer(psi, psi.conj())
+        return self._rho_initial
+
+    def _load_operators(self, storage: Optional[str] = None):
+        """Take the operators for self.params from the cache (or build them)."""
+        storage = storage or self.params.backend
+        if self.operator_cache is None:
+            operators = self._build_operators(storage)
+        else:
+            operators = self.operator_cache.get(
+                OperatorCache.key(self.params, storage),
+                lambda: self._build_operators(storage))
+        self.pointer_states = operators['pointer_states']
+        self.pointer_matrix = operators['pointer_matrix']
+        # None for the block backend until a path needs the full matrices
+        self._hamiltonian = operators.get('hamiltonian')
+        self._projectors = operators.get('projectors')
+
+    @property
+    def hamiltonian(self):
+        """H_int; the block backend builds the dense matrix on first use."""
+        if self._hamiltonian is None:
+            self._load_operators("dense")
+        return self._hamiltonian
+
+    @property
+    def projectors(self) -> list:
+        """Outcome projectors P_k; built on first use for the block backend."""
+        if self._projectors is None:
+            self._load_operators("dense")
+        return self._projectors
+
+    def _set_precision(self, dtype: str):
+        """Continue in `dtype`: reload the operators, drop derived buffers."""
+        self.params = replace(self.params, dtype=dtype)
+        self._load_operators()
+        self._rhs_input = None
+        self._rhs_workspace = None
+        self._liouvillian = None
+        if self._rho_initial is not None:
+            self._rho_initial = self._rho_initial.astype(dtype)
+
+    def _build_operators(self, storage: str) -> dict:
+        """Pointer states, interaction Hamiltonian and projectors."""
+        # Apparatus pointer states (orthonormal basis)
+        d_app = self.params.apparatus_dim
+        self.pointer_states = [
+            self._create_pointer_state(k, d_app)
+            for k in range(self.params.system_dim)
+        ]
+
+        dtype = self.params.dtype
+        operators = {
+            'pointer_states': [p.astype(dtype, copy=False)
+                               for p in self.pointer_states],
+            # Rows are the pointer states (used by the block backend)
+            'pointer_matrix': np.array(self.pointer_states, dtype=dtype),
+        }
+        if storage == "block":
+            # The block RHS needs only the pointer states
+            return operators
+
+        # Interaction Hamiltonian
+        operators['hamiltonian'] = self._build_hamiltonian(storage).astype(
+            dtype, copy=False)
+        # Projectors for collapse
+        operators['projectors'] = [P.astype(dtype, copy=False)
+                                   for P in self._build_projectors(storage)]
+        return operators
+
+    @classmethod
+    def _check_overlap_sampler(cls, params: DIIParameters):
+        if params.overlap_sampler not in cls.OVERLAP_SAMPLERS:
+            raise ValueError(
+                f"Unknown overlap_sampler {params.overlap_sampler!r}; "
+                f"expected one of {cls.OVERLAP_SAMPLERS}"
+            )
+
+    @staticmethod
+    def _pointer_indices(system_dim: int, apparatus_dim: int) -> np.ndarray:
+        """Basis index of each pointer state from _create_pointer_state."""
+        return np.arange(system_dim) % apparatus_dim
+
+    @classmethod
+    def _sample_apparatus(cls, apparatus: ApparatusMicrostate,
+                          params: DIIParameters):
+        """Draw a microstate with the sampler chosen in params."""
+        if params.overlap_sampler == "analytic":
+            indices = cls._pointer_indices(params.system_dim, params.apparatus_dim)
+            X = apparatus.pointer_overlaps
+            if X is None:
+                X = apparatus.sample_basis_overlaps(1, indices)[0]
+            apparatus.state = apparatus.sample_state_with_overlaps(X, indices)
+        else:
+            apparatus.sample_thermal_state()
+
+    @classmethod
+    def _reduce_model(cls, params: DIIParameters,
+                      apparatus: ApparatusMicrostate
+                      ) -> Tuple[DIIParameters, ApparatusMicrostate]:
+        """
+        Map the apparatus onto span{|A_k⟩} ⊕ span{|ψ_⊥⟩}.
+
+        H_int acts only on the pointer span and the dissipators act only
+        on the system, so the ρ generated from |ψ_S⟩ ⊗ |ψ_A⟩ stays inside
+        H_S ⊗ span{|A_1⟩, ..., |A_m⟩, |ψ_⊥⟩}, where |ψ_⊥⟩ is the
+        normalized part of |ψ_A⟩ orthogonal to the pointers. In that basis
+        the microstate is (⟨A_1|ψ_A⟩, ..., ⟨A_m|ψ_A⟩, ||ψ_⊥||) and the
+        pointers are again basis vectors, so the reduced model is an
+        ordinary simulation with apparatus_dim = m + 1. With the analytic
+        sampler no dim-length vector is ever drawn.
+
+        Returns:
+            (params with the reduced apparatus_dim, reduced microstate);
+            the inputs unchanged if the apparatus is already that small
+        """
+        d_app = params.apparatus_dim
+        n_pointers = min(params.system_dim, d_app)
+        if n_pointers + 1 >= d_app:
+            return params, apparatus
+
+        # Basis pointers are |0⟩, ..., |m-1⟩ (see _pointer_indices)
+        if apparatus.state is None and params.overlap_sampler == "analytic":
+            X = apparatus.pointer_overlaps
+            if X is None:
+                X = apparatus.sample_basis_overlaps(1, np.arange(n_pointers))[0]
+            phases = apparatus.rng.uniform(0, 2*np.pi, n_pointers)
+            amplitudes = np.sqrt(X) * np.exp(1j * phases)
+        else:
+            if apparatus.state is None:
+                apparatus.sample_thermal_state()
+            amplitudes = apparatus.state[:n_pointers]
+
+        # ||ψ_⊥||² is the weight outside the pointer span
+        lumped = np.sqrt(max(1.0 - np.sum(np.abs(amplitudes)**2), 0.0))
+
+        reduced = ApparatusMicrostate(n_pointers + 1, apparatus.rng)
+        reduced.state = np.append(amplitudes, lumped)
+        return replace(params, apparatus_dim=n_pointers + 1), reduced
+
+    @staticmethod
+    def _create_pointer_state(k: int, dim: int) -> np.ndarray:
+        """Create k-th apparatus pointer state."""
+        state = np.zeros(dim, dtype=complex)
+        # Simple model: pointer states are basis states
+        # More realistic: coherent states separated in phase space
+        state[k % dim] = 1.0
+        return state
+
+    def _build_hamiltonian(self, storage: str = "dense"):
+        """
+        Build interaction Hamiltonian.
+
+        H_int = g Σ_k |k⟩⟨k|_S ⊗ A_k
+
+        where A_k are apparatus operators coupling to pointer states.
+        """
+        d_sys = self.params.system_dim
+        d_app = self.params.apparatus_dim
+        g = self.params.coupling_strength
+
+        # For simplicity: H_int = g Σ_k |k⟩⟨k|_S ⊗ |A_k⟩⟨A_k|_A
+        if storage == "sparse":
+            return self._build_sparse_hamiltonian()
+
+        H = np.zeros((d_sys * d_app, d_sys * d_app), dtype=complex)
+
+        for k in range(min(d_sys, len(self.pointer_states))):
+            # System projector
+            P_sys = np.zeros((d_sys, d_sys))
+            P_sys[k, k] = 1.0
+
+            # Apparatus projector
+            P_app = np.outer(self.pointer_states[k],
+                           self.pointer_states[k].conj())
+
+            # Tensor product
+            H += g * np.kron(P_sys, P_app)
+
+        return H
+
+    def _build_sparse_hamiltonian(self) -> sparse.csr_array:
+        """
+        Sparse H_int, built without allocating the dense (D × D) matrix.
+
+        With basis pointer states H has d_S nonzeros; in general it has
+        Σ_k nnz(A_k)².
+        """
+        d_sys = self.params.system_dim
+        d_app = self.params.apparatus_dim
+        g = self.params.coupling_strength
+
+        H = sparse.csr_array((d_sys * d_app, d_sys * d_app), dtype=complex)
+
+        for k in range(min(d_sys, len(self.pointer_states))):
+            P_sys = sparse.csr_array(([1.0], ([k], [k])), shape=(d_sys, d_sys))
+
+            pointer = sparse.csr_array(self.pointer_states[k].reshape(1, -1))
+            P_app = pointer.T @ pointer.conj()
+
+            H = H + g * sparse.kron(P_sys, P_app, format="csr")
+
+        return H
+
+    def _build_projectors(self, storage: str = "dense") -> List[np.ndarray]:
+        """Build projection operators for each outcome."""
+        d_sys = self.params.system_dim
+        d_app = self.params.apparatus_dim
+
+        if storage == "sparse":
+            # Same projectors with d_A nonzeros each
+            return [
+                sparse.kron(
+                    sparse.csr_array(([1.0], ([k], [k])), shape=(d_sys, d_sys)),
+                    sparse.identity(d_app),
+                    format="csr"
+                )
+                for k in range(d_sys)
+            ]
+
+        projectors = []
+        for k in range(d_sys):
+            # System projector |k⟩⟨k|
+            P_sys = np.zeros((d_sys, d_sys))
+            P_sys[k, k] = 1.0
+
+            # Full projector (identity on apparatus)
+            P_full = np.kron(P_sys, np.eye(d_app))
+            projectors.append(P_full)
+
+        return projectors
+
+    def master_equation(self, rho_vec: np.ndarray, t: float,
+                        out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Master equation: dρ/dt = -i/ℏ[H,ρ] + L_deco + L_collapse.
+
+        Args:
+            rho_vec: Vectorized density matrix
+            t: Current time
+            out: Optional buffer of length D² for the dense backend
+
+        Returns:
+            dρ/dt (vectorized)
+        """
+        # Reshape to matrix
         dim = int(np.sqrt(len(rho_vec)))
         rho = rho_vec.reshape((dim, dim))
+        if rho.dtype != self.params.dtype:
+            # The solvers hand over their double-precision state; cast it
+            # into one reused buffer instead of a new copy per call
+            if self._rhs_input is None:
+                self._rhs_input = np.empty((dim, dim), dtype=self.params.dtype)
+            self._rhs_input[...] = rho
+            rho = self._rhs_input
+
+        if self.params.backend == "block":
+            return self._block_master_equation(rho, t).reshape(-1)
+
+        if self.params.backend == "dense":
+            if out is None:
+                # The solvers keep the returned derivative, so a fresh
+                # array is the one allocation per call
+                out = np.empty(dim * dim, dtype=rho.dtype)
+            self._fused_master_equation(rho, t, out.reshape((dim, dim)))
+            return out
 
         # 1. Unitary evolution: -i[H, ρ]
         commutator = self.hamiltonian @ rho - rho @ self.hamiltonian
@@ -435,6 +1675,107 @@ class DIISimulation:
 
         return drho_dt.flatten()
 
+    def _fused_master_equation(self, rho: np.ndarray, t: float,
+                               out: np.ndarray) -> np.ndarray:
+        """
+        Dense RHS written into `out` with no D × D temporaries.
+
+        The commutator is formed with matmul(..., out=) into `out` and one
+        preallocated workspace. For P_k = |k⟩⟨k|_S ⊗ I_A, dephasing and
+        collapse together scale the off-diagonal system blocks of ρ by
+        -(γ + 2λF), applied through the workspace with its diagonal
+        blocks zeroed in place.
+
+        Args:
+            rho: Density matrix, shape (D, D)
+            t: Current time
+            out: (D, D) destination
+
+        Returns:
+            out
+        """
+        work = self._rhs_workspace
+        if work is None or work.shape != rho.shape or work.dtype != rho.dtype:
+            work = self._rhs_workspace = np.empty_like(rho)
+
+        # 1. Unitary evolution: -i[H, ρ] = i(ρH - Hρ)
+        np.matmul(rho, self.hamiltonian, out=out)
+        np.matmul(self.hamiltonian, rho, out=work)
+        np.subtract(out, work, out=out)
+        out *= 1j
+
+        # 2. Update information functional
+        F = self._collapse_factor(rho, t)
+
+        # 3. Decoherence + collapse on the off-diagonal blocks
+        rate = self.params.decoherence_rate + 2 * self.params.collapse_rate * F
+        np.multiply(rho, -rate, out=work)
+        work_blocks = system_blocks(work, self.params.system_dim)
+        for k in range(self.params.system_dim):
+            work_blocks[k, :, k, :] = 0.0
+        np.add(out, work, out=out)
+
+        return out
+
+    def _block_master_equation(self, rho: np.ndarray, t: float) -> np.ndarray:
+        """
+        Master equation evaluated on the block representation of ρ.
+
+        Same dynamics as the dense path for the operators built in
+        _setup_system, at O(D²) per call instead of O(D³).
+
+        Args:
+            rho: Density matrix, shape (D, D)
+            t: Current time
+
+        Returns:
+            dρ/dt as a (D, D) matrix
+        """
+        rho_blocks = system_blocks(rho, self.params.system_dim)
+
+        # 1. Unitary evolution, block by block
+        drho = -1j * self._block_commutator(rho_blocks)
+
+        # 2. Decoherence (off-diagonal block decay)
+        drho += self._block_decoherence_term(rho_blocks)
+
+        # 3. Update information functional
+        self.info_func.compute(rho, t)
+
+        # 4. Collapse term
+        drho += self.collapse.block_collapse_term(rho_blocks)
+
+        return drho.reshape(rho.shape)
+
+    def _block_commutator(self, rho_blocks: np.ndarray) -> np.ndarray:
+        """
+        [H, ρ] for H = g Σ_k |k⟩⟨k|_S ⊗ |A_k⟩⟨A_k|_A in block form.
+
+        H is block diagonal with rank-1 blocks H_k = g |A_k⟩⟨A_k|, so
+        (Hρ)_ij = g |A_i⟩(⟨A_i|ρ_ij) and (ρH)_ij = g (ρ_ij|A_j⟩)⟨A_j|,
+        each an O(d_A²) product per block.
+        """
+        g = self.params.coupling_strength
+        A = self.pointer_matrix
+
+        # ⟨A_i|ρ_ij  -> (d_S, d_S, d_A) row vectors
+        bra = np.einsum('ia,...iajb->...ijb', A.conj(), rho_blocks)
+        # ρ_ij|A_j⟩  -> (d_S, d_A, d_S) column vectors
+        ket = np.einsum('...iajb,jb->...iaj', rho_blocks, A)
+
+        h_rho = np.einsum('ia,...ijb->...iajb', A, bra)
+        rho_h = np.einsum('...iaj,jb->...iajb', ket, A.conj())
+
+        return g * (h_rho - rho_h)
+
+    def _block_decoherence_term(self, rho_blocks: np.ndarray) -> np.ndarray:
+        """
+        Pure dephasing in block form: -γ times the off-diagonal blocks.
+        """
+        gamma = self.params.decoherence_rate
+        mask = offdiagonal_block_mask(self.params.system_dim, rho_blocks.real.dtype)
+        return -gamma * (mask * rho_blocks)
+
     def _decoherence_term(self, rho: np.ndarray) -> np.ndarray:
         """
         Decoherence Lindbladian (pure dephasing).
@@ -452,29 +1793,515 @@ class DIISimulation:
         # Dephasing
         return -gamma * (rho - rho_diag)
 
-    def evolve(self) -> Tuple[np.ndarray, np.ndarray]:
+    def iter_evolution(self, decimation: int = 1
+                       ) -> Iterator[Tuple[float, np.ndarray]]:
         """
-        Time-evolve the system.
+        Time-evolve the system, yielding states as they are computed.
 
-        Returns:
-            (times, rho_trajectory)
+        Nothing is stored, so memory stays at a few copies of ρ however
+        long the run. Every `decimation`-th output time is yielded; the
+        final time is always included.
+
+        Events in params.stop_events are checked at every output time; the
+        run stops at the first one, after yielding that time, and
+        self.event is set to (name, event time). Crossing times of the
+        "threshold" and "collapse" events are interpolated linearly in ΔI
+        between output times; "stationary" compares the mean rate
+        ||ρ(t) - ρ(t - dt)||_F / dt against params.stationary_tolerance.
+
+        Args:
+            decimation: Yield every n-th point of the dt output grid
+
+        Yields:
+            (t, ρ) with ρ as a (D, D) matrix, or as a DephasedPureState /
+            LowRankState when the factored representations are in use
         """
+        if decimation < 1:
+            raise ValueError(f"decimation must be >= 1, got {decimation}")
+        events = self._event_levels()
+
         # Time points
         times = np.arange(0, self.params.t_final, self.params.dt)
+        last = len(times) - 1
+
+        self.event = None
+        self.precision_fallback = None
+        previous = None  # (t, ΔI, ρ) at the last output time
+        for n, (t, rho) in enumerate(self._iter_outputs(times)):
+            if events:
+                delta_I, _ = self.info_func.get_information_gap()
+                self.event = self._detect_event(events, previous, t, delta_I, rho)
+                previous = (t, delta_I, rho)
+
+            if n % decimation == 0 or n == last or self.event is not None:
+                yield t, rho
+            if self.event is not None:
+                return
+
+    def _event_levels(self) -> dict:
+        """Validated stop events, mapped to their ΔI level where relevant."""
+        levels = {}
+        for name in self.params.stop_events:
+            if name not in self.STOP_EVENTS:
+                raise ValueError(
+                    f"Unknown stop event {name!r}; expected one of {self.STOP_EVENTS}"
+                )
+            if name == "threshold":
+                levels[name] = self.params.threshold
+            elif name == "collapse":
+                # F = tanh(ΔI / Δ_crit) >= level  <=>  ΔI >= Δ_crit artanh(level)
+                levels[name] = self.params.threshold * np.arctanh(
+                    self.params.collapse_level)
+            else:
+                levels[name] = None
+        return levels
+
+    def _detect_event(self, events: dict, previous: Optional[tuple], t: float,
+                      delta_I: float, rho) -> Optional[Tuple[str, float]]:
+        """First event reached at output time t, as (name, event time)."""
+        for name, level in events.items():
+            if name == "stationary":
+                if previous is None:
+                    continue
+                t_prev, _, rho_prev = previous
+                rate = _frobenius_distance(rho, rho_prev) / (t - t_prev)
+                if rate < self.params.stationary_tolerance:
+                    return name, t
+            elif delta_I >= level:
+                if previous is None:
+                    return name, t
+                t_prev, delta_prev, _ = previous
+                # Linear interpolation of the crossing ΔI = level
+                fraction = (level - delta_prev) / (delta_I - delta_prev) \
+                    if delta_I > delta_prev else 1.0
+                return name, t_prev + min(max(fraction, 0.0), 1.0) * (t - t_prev)
+        return None
+
+    def _iter_outputs(self, times: np.ndarray) -> Iterator[Tuple[float, np.ndarray]]:
+        """Yield (t, ρ) at every output time, recording the information."""
+
+        # Initial condition
+        start = 0
+        switched = None
+        tolerance = self.params.pure_state_tolerance
+
+        if tolerance is not None:
+            # Factored representation while the state is nearly pure
+            for n, state in enumerate(self._iter_pure_evolution(times)):
+                if 1 - state.purity() > tolerance:
+                    start, switched = n, state
+                    break
+                t = times[n]
+                self.info_func.record(
+                    t, self.info_func.compute_reduced(state.system_state(), t))
+                yield t, state
+            else:
+                return
+
+        if self.params.integrator == "lowrank":
+            factor = switched.factor if switched is not None \
+                else self.psi_initial[:, :, None]
+            states = self._iter_lowrank_evolution(times[start:], factor)
+
+            for t, state in zip(times[start:], states):
+                self.info_func.record(
+                    t, self.info_func.compute_reduced(state.system_state(), t))
+                yield t, state
+            return
+
+        rho0 = switched.to_density_matrix().astype(self.params.dtype) \
+            if switched is not None else self.rho_initial
+
+        for _, t, rho in iter_precision_guarded(self, self._dense_solution,
+                                                rho0, times[start:]):
+            self.info_func.record(t, self.info_func.compute(rho, t))
+            yield t, rho
+
+    def _dense_solution(self, rho0: np.ndarray, times: np.ndarray
+                        ) -> Iterator[Tuple[float, np.ndarray]]:
+        """(t, ρ vector) at every output time with the configured integrator."""
+        if self.params.interaction_picture:
+            return self._interaction_solution(rho0, times)
+        if self.params.integrator == "expm":
+            return self._expm_solution(rho0.flatten(), times)
+        if self.params.integrator == "strang":
+            return self._strang_solution(rho0, times)
+
+        # Integrate ODE (complex-native unless integrator="odeint")
+        return integrate_ode(
+            lambda t, rho: self.master_equation(rho, t),
+            rho0.flatten(),
+            times,
+            method=self.params.integrator,
+            rtol=self.params.rtol,
+            atol=self.params.atol,
+            jac=self._jacobian,
+            spectral_radius=self._dissipation_rate
+        )
 
-        # Initial condition (vectorized)
-        rho0_vec = self.rho_initial.flatten()
+    def _diagonal_energies(self) -> np.ndarray:
+        """Eigenvalues E_i of H when it is diagonal in the product basis."""
+        H = self.hamiltonian
+        energies = H.diagonal()
+        off_diagonal = (H.nnz if sparse.issparse(H) else np.count_nonzero(H)) \
+            - np.count_nonzero(energies)
+        if off_diagonal:
+            raise ValueError("interaction_picture requires a diagonal "
+                             "Hamiltonian (basis pointer states)")
+        return energies.real
+
+    def _interaction_solution(self, rho0: np.ndarray, times: np.ndarray
+                              ) -> Iterator[Tuple[float, np.ndarray]]:
+        """
+        Integrate in the interaction picture of the diagonal H.
 
-        # Integrate ODE
-        # Using complex ODE integration
-        rho_trajectory = odeint(
-            lambda rho, t: self.master_equation(rho, t),
-            rho0_vec,
-            times,
-            tfirst=True
+        With ρ = U ρ̃ U†, U = exp(-iH(t - t0)), the elements are
+        ρ_ij = e^{-i(E_i - E_j)(t - t0)} ρ̃_ij. Dephasing and collapse only
+        scale off-diagonal system blocks, which commutes with these phases,
+        so dρ̃/dt = -(γ + 2λF) offdiag(ρ̃): no oscillation at the coupling
+        frequency for the integrator to resolve. F needs ρ_S, which only
+        involves the apparatus-diagonal elements of each block.
+
+        Yields:
+            (t, ρ vector) in the Schrödinger picture for every t in times
+        """
+        if self.params.integrator not in RK_SOLVERS and self.params.integrator != "odeint":
+            raise ValueError(
+                f"interaction_picture supports 'odeint' and {tuple(RK_SOLVERS)}, "
+                f"not {self.params.integrator!r}"
+            )
+        d_sys = self.params.system_dim
+        energies = self._diagonal_energies()
+        E_blocks = energies.reshape(d_sys, -1)
+        mask = offdiagonal_block_mask(d_sys)
+        gamma = self.params.decoherence_rate
+        lam = self.params.collapse_rate
+        shape = rho0.shape
+        t0 = times[0]
+
+        def dissipator(t, rho_vec):
+            rho_blocks = system_blocks(rho_vec.reshape(shape), d_sys)
+
+            # ρ_S[i, j] = Σ_a e^{-i(E_ia - E_ja)(t - t0)} ρ̃[ia, ja]
+            phases = np.exp(-1j * E_blocks * (t - t0))
+            rho_system = np.einsum('ia,iaja,ja->ij', phases,
+                                   rho_blocks, phases.conj())
+            F = self._reduced_collapse_factor(rho_system, t)
+
+            return (-(gamma + 2 * lam * F) * (mask * rho_blocks)).reshape(-1)
+
+        solution = integrate_ode(dissipator, rho0.flatten(), times,
+                                 method=self.params.integrator,
+                                 rtol=self.params.rtol, atol=self.params.atol)
+        for t, rho_tilde in solution:
+            phases = np.exp(-1j * energies * (t - t0))
+            rho = phases[:, None] * rho_tilde.reshape(shape) * phases.conj()
+            yield t, rho.reshape(-1)
+
+    def _iter_lowrank_evolution(self, times: np.ndarray, factor: np.ndarray
+                                ) -> Iterator[LowRankState]:
+        """
+        Step ρ = L L† over the output grid in O(D·r²) per step.
+
+        Over each interval H acts on L exactly, as a rank-1 phase per system
+        block, and since H commutes with dephasing and collapse these
+        combine into one channel ρ -> c ρ + (1-c) Σ_k P_k ρ P_k with
+        c = exp(-∫(γ + 2λF) dt). The exponent is integrated as a scalar ODE
+        (F from the system state implied by L and the running c), the
+        channel is applied as Kraus blocks and L is compressed with
+        truncate_factor. The discarded trace weight accumulates in
+        self.truncation_error.
+
+        Args:
+            times: Output times
+            factor: L(times[0]) as (d_S, d_A, r) blocks
+
+        Yields:
+            LowRankState at every output time
+        """
+        g = self.params.coupling_strength
+        A = self.pointer_matrix
+
+        def rotate(L, dt):
+            # exp(-iH dt) on every column of L
+            return rotate_pointer_blocks(L.transpose(2, 0, 1), A, g * dt
+                                         ).transpose(1, 2, 0)
+
+        self.truncation_error = 0.0
+        factor, error = truncate_factor(factor, self.params.rank_tolerance,
+                                        self.params.max_rank)
+        self.truncation_error += error
+        yield LowRankState(factor)
+
+        for t0, t1 in zip(times[:-1], times[1:]):
+            # ρ_S of channel(U ρ U†): off-diagonal entries scaled by c
+            def system_state(t, decay, L=factor, t0=t0):
+                gram = LowRankState(rotate(L, t - t0)).system_state()
+                weights = np.full(gram.shape, np.exp(-decay))
+                np.fill_diagonal(weights, 1.0)
+                return weights * gram
+
+            *_, (_, decay) = self._iter_decay_exponent(system_state, [t0, t1])
+
+            factor = _dephasing_kraus_factor(rotate(factor, t1 - t0),
+                                             np.exp(-decay))
+            factor, error = truncate_factor(factor, self.params.rank_tolerance,
+                                            self.params.max_rank)
+            self.truncation_error += error
+            yield LowRankState(factor)
+
+    def _iter_pure_evolution(self, times: np.ndarray
+                             ) -> Iterator[DephasedPureState]:
+        """
+        Exact evolution in the DephasedPureState representation.
+
+        ψ(t) follows the block-diagonal H in closed form, as a rank-1 phase
+        per system block; only the scalar Λ = -ln c with dΛ/dt = γ + 2λF
+        is integrated, F coming from the system state implied by (ψ, c).
+        """
+        g = self.params.coupling_strength
+
+        def state_at(t, decay):
+            psi = rotate_pointer_blocks(self.psi_initial, self.pointer_matrix, g * t)
+            return DephasedPureState(psi, np.exp(-decay))
+
+        for t, decay in self._iter_decay_exponent(
+                lambda t, decay: state_at(t, decay).system_state(), times):
+            yield state_at(t, decay)
+
+    def _iter_decay_exponent(self, system_state: Callable[[float, float], np.ndarray],
+                             times: Sequence[float]) -> Iterator[Tuple[float, float]]:
+        """
+        Integrate Λ = ∫(γ + 2λF) dt from Λ(times[0]) = 0.
+
+        F comes from the information gap of system_state(t, Λ). Λ is a
+        single real ODE, so integrators other than the RK methods fall
+        back to RK45.
+
+        Yields:
+            (t, Λ) at every output time
+        """
+        gamma = self.params.decoherence_rate
+        lam = self.params.collapse_rate
+
+        def rate(t, y):
+            F = self._reduced_collapse_factor(system_state(t, y[0]), t)
+            return np.array([gamma + 2 * lam * F])
+
+        method = self.params.integrator
+        if method not in RK_SOLVERS:
+            method = "RK45"
+
+        for t, y in integrate_ode(rate, np.zeros(1), times, method=method,
+                                  rtol=self.params.rtol, atol=self.params.atol):
+            yield t, y[0]
+
+    def evolve(self, observables: Optional[Sequence] = None,
+               decimation: int = 1) -> Tuple[np.ndarray, object]:
+        """
+        Time-evolve the system.
+
+        Without observables the full trajectory is materialized, as
+        (times, rho_trajectory) with one flattened ρ per row. With
+        observables only their values are kept and the return value is
+        (times, {name: values}). With params.pure_state_tolerance set,
+        self.rho_final is a DephasedPureState if the run never left the
+        factored form (np.asarray gives the matrix).
+
+        Args:
+            observables: Names from OBSERVABLES ("populations",
+                "coherences", "purity", "trace", "information_gap") or
+                callables f(t, ρ)
+            decimation: Keep every n-th point of the dt output grid
+
+        Returns:
+            (times, rho_trajectory) or (times, observable_values)
+        """
+        evaluators = resolve_observables(observables, self.params.system_dim) \
+            if observables is not None else None
+
+        times, trajectory, self.rho_final = collect_outputs(
+            self.iter_evolution(decimation), evaluators)
+        return times, trajectory
+
+    def liouvillian(self) -> Tuple[sparse.csr_array, sparse.csr_array]:
+        """
+        Sparse Liouvillian superoperators acting on ρ.flatten().
+
+        The master equation is dρ/dt = (L_lin + F L_collapse) ρ, where
+        L_lin (unitary + dephasing) is time-independent and only the
+        collapse factor F depends on the state. With row-major
+        vectorization vec(A ρ B) = (A ⊗ Bᵀ) vec(ρ).
+
+        Built once and cached on the instance.
+
+        Returns:
+            (L_lin, L_collapse), each of shape (D², D²); L_collapse is the
+            collapse superoperator for F = 1
+        """
+        if self._liouvillian is not None:
+            return self._liouvillian
+
+        gamma = self.params.decoherence_rate
+        lam = self.params.collapse_rate
+
+        H = sparse.csr_array(self.hamiltonian)
+        projectors = [sparse.csr_array(P) for P in self.projectors]
+        identity = sparse.identity(H.shape[0], dtype=complex, format="csr")
+
+        # -i[H, ρ]
+        L_unitary = -1j * (sparse.kron(H, identity) - sparse.kron(identity, H.T))
+
+        # Σ_k P_k ρ P_k
+        L_diag = sum(sparse.kron(P, P.T) for P in projectors)
+
+        # -γ (ρ - Σ_k P_k ρ P_k)
+        L_deco = -gamma * (sparse.kron(identity, identity) - L_diag)
+
+        # -λ Σ_k (P_k ρ + ρ P_k - 2 P_k ρ P_k)
+        L_collapse = -lam * (
+            sum(sparse.kron(P, identity) + sparse.kron(identity, P.T)
+                for P in projectors)
+            - 2 * L_diag
         )
 
-        return times, rho_trajectory
+        self._liouvillian = (sparse.csr_array(L_unitary + L_deco),
+                             sparse.csr_array(L_collapse))
+        return self._liouvillian
+
+    def _jacobian(self, t: float, rho_vec: np.ndarray) -> sparse.csc_array:
+        """
+        Sparse Jacobian L_lin + F L_collapse of the master equation.
+
+        F depends on ρ only through the information gap; it is frozen at
+        the current state, which is what the implicit solvers need between
+        their (infrequent) Jacobian updates.
+        """
+        L_lin, L_collapse = self.liouvillian()
+        dim = self.psi_initial.size
+        F = self._collapse_factor(rho_vec.reshape((dim, dim)), t)
+        return sparse.csc_array(L_lin + F * L_collapse)
+
+    def _dissipation_rate(self, t: float, rho_vec: np.ndarray) -> float:
+        """Largest decay rate γ + 2λF of the dissipator at this state."""
+        dim = self.psi_initial.size
+        F = self._collapse_factor(rho_vec.reshape((dim, dim)), t)
+        return self.params.decoherence_rate + 2 * self.params.collapse_rate * abs(F)
+
+    def _collapse_factor(self, rho: np.ndarray, t: float) -> float:
+        """Collapse factor F for the current state."""
+        self.info_func.compute(rho, t)
+        return self.collapse.current_factor()
+
+    def _reduced_collapse_factor(self, rho_system: np.ndarray, t: float) -> float:
+        """Collapse factor F from the system reduced state alone."""
+        self.info_func.compute_reduced(rho_system, t)
+        return self.collapse.current_factor()
+
+    def _expm_solution(self, rho0_vec: np.ndarray,
+                       times: np.ndarray) -> Iterator[Tuple[float, np.ndarray]]:
+        """
+        Propagate with the exact exponential of the Liouvillian.
+
+        L_lin and L_collapse act blockwise and commute, so
+        exp((L_lin + F L_collapse)(t - t0)) ρ0 is ρ0 rotated by
+        exp(-iH(t - t0)) (conjugate_pointer_blocks) with its off-diagonal
+        system blocks scaled by exp(-γ(t - t0) - 2λΛ), Λ = ∫F dt. F is
+        evaluated at the start of each output interval and held constant
+        across it. Each output costs O(D²), independent of dt and of the
+        operator norms.
+
+        Yields:
+            (t, ρ vector) for every t in times
+        """
+        dim = self.psi_initial.size
+        d_sys = self.params.system_dim
+        g = self.params.coupling_strength
+        gamma = self.params.decoherence_rate
+        lam = self.params.collapse_rate
+        blocks0 = system_blocks(rho0_vec.reshape((dim, dim)), d_sys)
+
+        decay = 0.0  # Λ up to the current output time
+        for n, t in enumerate(times):
+            elapsed = t - times[0]
+            rotated = conjugate_pointer_blocks(blocks0, self.pointer_matrix,
+                                               g * elapsed).reshape((dim, dim))
+            rho = scale_offdiagonal_blocks(
+                rotated, d_sys, float(np.exp(-gamma * elapsed - 2 * lam * decay)))
+            yield t, rho.reshape(-1)
+
+            if lam != 0 and n < len(times) - 1:
+                decay += self._collapse_factor(rho, t) * (times[n + 1] - t)
+
+    def _strang_solution(self, rho0: np.ndarray, times: np.ndarray
+                         ) -> Iterator[Tuple[float, np.ndarray]]:
+        """
+        Propagate with Strang splitting into the exact sub-flows.
+
+        A step of size h is D(h/2) U(h) D(h/2), with U the unitary flow
+        (conjugate_pointer_blocks) and D the dephasing and collapse decay
+        (scale_offdiagonal_blocks). F is frozen per step at a midpoint
+        predictor, which keeps the scheme second order; the local error
+        is estimated by step doubling and h adapted to rtol/atol, clamped
+        to 100 eps of the working dtype.
+
+        Yields:
+            (t, ρ vector) for every t in times
+        """
+        d_sys = self.params.system_dim
+        g = self.params.coupling_strength
+        gamma = self.params.decoherence_rate
+        lam = self.params.collapse_rate
+        # Like scipy's solvers, never ask for more than the dtype resolves
+        floor = 100 * np.finfo(rho0.dtype).eps
+        rtol, atol = max(self.params.rtol, floor), max(self.params.atol, floor)
+
+        def rotate(rho, h):
+            return conjugate_pointer_blocks(system_blocks(rho, d_sys),
+                                            self.pointer_matrix, g * h
+                                            ).reshape(rho.shape)
+
+        def decay(rho, F, h):
+            return scale_offdiagonal_blocks(
+                rho, d_sys, float(np.exp(-(gamma + 2 * lam * F) * h)))
+
+        def step(rho, t, h, F):
+            midpoint = rotate(decay(rho, F, h / 2), h / 2)
+            F = self._collapse_factor(midpoint, t + h / 2)
+            return decay(rotate(decay(rho, F, h / 2), h), F, h / 2)
+
+        rho = rho0
+        t = times[0]
+        yield t, rho.reshape(-1)
+        if len(times) == 1:
+            return
+
+        h = times[1] - times[0]
+        for t_out in times[1:]:
+            while t < t_out:
+                h_step = min(h, t_out - t)
+                F = self._collapse_factor(rho, t)
+                coarse = step(rho, t, h_step, F)
+                half = step(rho, t, h_step / 2, F)
+                fine = step(half, t + h_step / 2, h_step / 2,
+                            self._collapse_factor(half, t + h_step / 2))
+
+                # Richardson estimate of the local error of the fine result
+                scale = atol + rtol * np.maximum(np.abs(fine), np.abs(rho))
+                error = np.sqrt(np.mean(np.abs((fine - coarse) / (3 * scale)) ** 2))
+                factor = 5.0 if error == 0 else min(5.0, max(0.2, 0.9 * error ** (-1 / 3)))
+
+                if error <= 1:
+                    t = t_out if h_step == t_out - t else t + h_step
+                    rho = fine
+                    # A step shortened to land on t_out says nothing about h
+                    h = max(h, h_step * factor) if h_step < h else h_step * factor
+                else:
+                    h = h_step * factor
+                    if h < 1e-14 * max(1.0, abs(t)):
+                        raise RuntimeError(f"strang integration failed at t={t}: "
+                                           "step size too small")
+            yield t_out, rho.reshape(-1)
 
     def determine_outcome(self, amplitudes: np.ndarray) -> int:
         """
@@ -488,23 +2315,23 @@ class DIISimulation:
         Returns:
             Outcome index k
         """
-        probs_born = np.abs(amplitudes)**2
+        return select_outcome(amplitudes, self.X_overlaps)
 
-        # Deterministic selection
-        selection_weights = probs_born * self.X_overlaps
-        outcome = np.argmax(selection_weights)
-
-        return outcome
-
-    def run_single_measurement(self) -> dict:
+    def run_single_measurement(self, observables: Optional[Sequence] = None,
+                               decimation: int = 1) -> dict:
         """
         Run a single measurement simulation.
 
+        Args:
+            observables: If given, record these on the fly (see evolve)
+                instead of returning the full 'rho_trajectory'
+            decimation: Keep every n-th point of the dt output grid
+
         Returns:
             Dictionary with outcome, overlaps, trajectory, etc.
         """
         # Evolve system
-        times, rho_traj = self.evolve()
+        times, trajectory = self.evolve(observables, decimation)
 
         # Get system state (initial superposition)
         d_sys = self.params.system_dim
@@ -513,71 +2340,929 @@ class DIISimulation:
         # Determine outcome
         outcome = self.determine_outcome(amplitudes)
 
-        # Extract final density matrix
-        rho_final = rho_traj[-1].reshape(self.rho_initial.shape)
+        result = {
+            'outcome': outcome,
+            'X_overlaps': self.X_overlaps,
+            'amplitudes': amplitudes,
+            'times': times,
+            'rho_final': self.rho_final,
+            'info_history': self.info_func.history,
+            'event': self.event[0] if self.event else None,
+            'event_time': self.event[1] if self.event else None
+        }
+        if observables is None:
+            result['rho_trajectory'] = trajectory
+        else:
+            result['observables'] = trajectory
+
+        return result
+
+
+class DIIQuantumTrajectories:
+    """
+    Quantum-jump unraveling of the DII master equation.
+
+    With P_k = |k⟩⟨k|_S ⊗ I_A and Σ_k P_k = I, dephasing and collapse are
+    both Lindblad dissipators with jump operators √Γ P_k, where
+    Γ(t) = γ + 2λF(t). Since Σ_k L_k†L_k = Γ I the jump rate is Γ for
+    every state, and a jump projects onto sector k with probability
+    ||P_k ψ||². Between jumps the evolution is unitary under the block
+    diagonal H, applied exactly as a rank-1 phase per system block.
+
+    Each trajectory is a state vector of length d_S·d_A, so memory is
+    O(n_trajectories · D) instead of O(D²). The collapse factor F is
+    computed from the ensemble-averaged system state and held constant
+    over each output interval dt, which makes every step exact for that F.
+    """
+
+    def __init__(self, params: DIIParameters, n_trajectories: int = 100):
+        self.n_trajectories = n_trajectories
+        self.apparatus = ApparatusMicrostate(params.apparatus_dim, params.random_seed)
+        if params.reduced_model:
+            params, self.apparatus = DIISimulation._reduce_model(params, self.apparatus)
+        self.params = params
+        self.info_func = InformationFunctional(params)
+        self.collapse = CollapseDynamics(params, self.info_func)
+
+        # Jump stream is independent of the apparatus microstate stream
+        seed_seq = np.random.SeedSequence(params.random_seed)
+        self.jump_rng = np.random.default_rng(seed_seq.spawn(1)[0])
+
+        self._setup_system()
+
+    def _setup_system(self):
+        """Initialize state vectors and pointer states (no D×D objects)."""
+        d_sys = self.params.system_dim
+        d_app = self.params.apparatus_dim
+
+        self.psi_system = np.ones(d_sys, dtype=complex) / np.sqrt(d_sys)
+
+        # Pointer k lives in system block k (rows of a (d_S, d_A) matrix)
+        self.pointer_matrix = np.zeros((d_sys, d_app), dtype=complex)
+        self.pointer_matrix[np.arange(d_sys),
+                            DIISimulation._pointer_indices(d_sys, d_app)] = 1.0
+
+        if self.apparatus.state is None:
+            DIISimulation._sample_apparatus(self.apparatus, self.params)
+        self.X_overlaps = self.apparatus.compute_overlaps(self.pointer_matrix)
+
+        # |ψ_S⟩ ⊗ |ψ_A⟩ as a (d_S, d_A) block array
+        self.psi_initial = np.outer(self.psi_system, self.apparatus.state)
+
+    def _unitary_step(self, psi: np.ndarray, dt: float) -> np.ndarray:
+        """
+        Apply exp(-i H dt) to a stack of (d_S, d_A) block states in place.
+
+        See rotate_pointer_blocks.
+        """
+        psi[...] = rotate_pointer_blocks(psi, self.pointer_matrix,
+                                         self.params.coupling_strength * dt)
+        return psi
+
+    def _system_state(self, psi: np.ndarray) -> np.ndarray:
+        """Ensemble-averaged system reduced density matrix."""
+        return np.einsum('mia,mja->ij', psi, psi.conj()) / psi.shape[0]
+
+    def evolve(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Evolve all trajectories on the output grid.
+
+        Returns:
+            (times, rho_system_trajectory) with the ensemble-averaged
+            system reduced density matrix at every output time
+        """
+        times = np.arange(0, self.params.t_final, self.params.dt)
+        gamma = self.params.decoherence_rate
+        lam = self.params.collapse_rate
+
+        psi = np.repeat(self.psi_initial[None], self.n_trajectories, axis=0)
+        self.jump_times = np.full(self.n_trajectories, np.nan)
+        self.jump_outcomes = np.full(self.n_trajectories, -1)
+
+        rho_system_trajectory = np.empty(
+            (len(times), self.params.system_dim, self.params.system_dim),
+            dtype=complex
+        )
+
+        for n, t in enumerate(times):
+            rho_system = self._system_state(psi)
+            rho_system_trajectory[n] = rho_system
+            self.info_func.record(t, self.info_func.compute_reduced(rho_system, t))
+            if n == len(times) - 1:
+                break
+
+            dt = times[n + 1] - t
+
+            # Collapse factor from the ensemble state, frozen over the step
+            rate = gamma + 2 * lam * self.collapse.current_factor()
+
+            # P_k commutes with H, so jump and unitary order is irrelevant
+            self._unitary_step(psi, dt)
+
+            jumped = self.jump_rng.random(self.n_trajectories) < -np.expm1(-rate * dt)
+            for m in np.flatnonzero(jumped):
+                weights = np.sum(np.abs(psi[m])**2, axis=1)
+                k = self.jump_rng.choice(len(weights), p=weights / weights.sum())
+
+                psi[m, np.arange(len(weights)) != k] = 0.0
+                psi[m] /= np.sqrt(weights[k])
+
+                if self.jump_outcomes[m] < 0:
+                    self.jump_times[m] = t + dt
+                    self.jump_outcomes[m] = k
+
+        self.psi_final = psi.reshape(self.n_trajectories, -1)
+        return times, rho_system_trajectory
+
+    def density_matrix(self) -> np.ndarray:
+        """
+        Reconstruct the full ensemble density matrix from final states.
+
+        ρ = (1/M) Σ_m |ψ_m⟩⟨ψ_m| is D × D; only call this for small D.
+        """
+        psi = self.psi_final
+        return psi.T @ psi.conj() / psi.shape[0]
+
+    def determine_outcome(self, amplitudes: np.ndarray) -> int:
+        """Deterministic selection k = argmax_i (|c_i|² X_i)."""
+        return select_outcome(amplitudes, self.X_overlaps)
+
+    def run_single_measurement(self) -> dict:
+        """
+        Run a single measurement with the unraveled dynamics.
+
+        Returns:
+            Dictionary with outcome, overlaps, system-state trajectory,
+            jump records and final trajectory states
+        """
+        times, rho_system_traj = self.evolve()
+
+        amplitudes = self.psi_system.copy()
+        outcome = self.determine_outcome(amplitudes)
 
         return {
             'outcome': outcome,
             'X_overlaps': self.X_overlaps,
             'amplitudes': amplitudes,
             'times': times,
-            'rho_trajectory': rho_traj,
-            'rho_final': rho_final,
+            'rho_system_trajectory': rho_system_traj,
+            'rho_system_final': rho_system_traj[-1],
+            'jump_times': self.jump_times,
+            'jump_outcomes': self.jump_outcomes,
+            'psi_final': self.psi_final,
             'info_history': self.info_func.history
         }
 
 
-class DIIEnsemble:
+class DIIBatchSimulation:
     """
-    Run ensemble of measurements to verify Born rule statistics.
+    Evolve a batch of DII trials together as one (B, D, D) stack.
+
+    Trials in an ensemble differ only in the apparatus microstate, i.e. in
+    ρ(0). The operators are built once and the RHS is vectorized over the
+    batch axis; each member's collapse factor F_b comes from its own
+    information gap. The stack is integrated as a single ODE, so B small
+    Python-driven integrations become one integration of large array
+    operations.
+
+    Dephasing and collapse use the block-mask form, which is exact for
+    the projectors built by DIISimulation._build_projectors.
     """
 
-    def __init__(self, params: DIIParameters, n_trials: int = 1000):
-        self.params = params
-        self.n_trials = n_trials
-        self.results = []
+    def __init__(self, params: DIIParameters, seeds: Sequence):
+        if params.integrator not in RK_SOLVERS and params.integrator != "odeint":
+            raise ValueError(
+                f"Batched evolution supports 'odeint' and {tuple(RK_SOLVERS)}, "
+                f"not {params.integrator!r}"
+            )
+        if params.stop_events:
+            raise ValueError("Batched evolution does not support stop_events; "
+                             "members would stop at different times")
+        if params.interaction_picture or params.pure_state_tolerance is not None:
+            raise ValueError("Batched evolution integrates the full ρ stack; "
+                             "interaction_picture and pure_state_tolerance "
+                             "are not supported")
+        self.seeds = list(seeds)
+        self.batch_size = len(self.seeds)
+
+        # One microstate per member, sampled in member order (members may
+        # share a Generator, which then supplies consecutive draws); an
+        # ApparatusMicrostate is used as given
+        self.apparatus = []
+        model_params = params
+        for seed in self.seeds:
+            apparatus = seed if isinstance(seed, ApparatusMicrostate) else \
+                ApparatusMicrostate(params.apparatus_dim, seed)
+            if params.reduced_model:
+                model_params, apparatus = DIISimulation._reduce_model(params, apparatus)
+            if apparatus.state is None:
+                DIISimulation._sample_apparatus(apparatus, params)
+            self.apparatus.append(apparatus)
+        params = self.params = model_params
+
+        # Shared operators (H, P_k, pointer states) from the first member
+        self.template = DIISimulation(params, apparatus=self.apparatus[0])
+        self._rhs_input = None
+        self._setup_batch()
+
+    def _setup_batch(self):
+        """Stack ρ(0) over the members' microstates."""
+        d_sys = self.params.system_dim
+        d_app = self.params.apparatus_dim
+        dim = d_sys * d_app
+
+        states = np.array([apparatus.state for apparatus in self.apparatus])
+        self.X_overlaps = np.array([
+            apparatus.compute_overlaps(self.template.pointer_states)
+            for apparatus in self.apparatus
+        ])
 
-    def run_ensemble(self, verbose: bool = True) -> dict:
+        psi_sys = np.ones(d_sys, dtype=complex) / np.sqrt(d_sys)
+        rho_sys = np.outer(psi_sys, psi_sys.conj())
+
+        # kron(ρ_S, |ψ_b⟩⟨ψ_b|) for every member b
+        self.rho_initial = np.einsum(
+            'ij,ba,bc->biajc', rho_sys, states, states.conj()
+        ).reshape(self.batch_size, dim, dim).astype(self.params.dtype, copy=False)
+
+        self.histories = [InformationHistory.for_run(self.params)
+                          for _ in range(self.batch_size)]
+
+    def _commutator(self, rho: np.ndarray) -> np.ndarray:
+        """[H, ρ_b] for every member of the stack."""
+        if self.params.backend == "block":
+            blocks = system_blocks(rho, self.params.system_dim)
+            return self.template._block_commutator(blocks).reshape(rho.shape)
+
+        H = self.template.hamiltonian
+        if sparse.issparse(H):
+            B, D, _ = rho.shape
+            # Stack members side by side so each product is one sparse matmul
+            h_rho = (H @ rho.transpose(1, 0, 2).reshape(D, -1)) \
+                .reshape(D, B, D).transpose(1, 0, 2)
+            rho_h = (H.T @ rho.transpose(2, 0, 1).reshape(D, -1)) \
+                .reshape(D, B, D).transpose(1, 2, 0)
+            return h_rho - rho_h
+
+        return H @ rho - rho @ H
+
+    def collapse_factors(self, rho: np.ndarray) -> np.ndarray:
+        """Per-member collapse factor F_b from each member's own gap."""
+        rho_system = partial_trace(
+            rho, (self.params.system_dim, rho.shape[-1] // self.params.system_dim),
+            keep=(0,)
+        )
+        gaps, _ = information_gap(branch_information(rho_system))
+        return self.template.collapse.collapse_functional(gaps)
+
+    def master_equation(self, rho_vec: np.ndarray, t: float) -> np.ndarray:
         """
-        Run N independent measurement trials.
+        Batched master equation on the flattened (B, D, D) stack.
 
-        Each trial has different apparatus microstate (thermal fluctuations).
+        Args:
+            rho_vec: Flattened stack of density matrices
+            t: Current time
 
         Returns:
-            Statistics dictionary
+            dρ/dt for every member (flattened)
+        """
+        rho = rho_vec.reshape(self.rho_initial.shape)
+        if rho.dtype != self.params.dtype:
+            # Cast the solver's double-precision state into a reused buffer
+            if self._rhs_input is None:
+                self._rhs_input = np.empty(rho.shape, dtype=self.params.dtype)
+            self._rhs_input[...] = rho
+            rho = self._rhs_input
+
+        # 1. Unitary evolution
+        drho = -1j * self._commutator(rho)
+
+        # 2 + 4. Dephasing and collapse scale the off-diagonal blocks
+        F = self.collapse_factors(rho)
+        rate = (self.params.decoherence_rate + 2 * self.params.collapse_rate * F
+                ).astype(rho.real.dtype)
+
+        mask = offdiagonal_block_mask(self.params.system_dim, rho.real.dtype)
+        drho_blocks = system_blocks(drho, self.params.system_dim)
+        drho_blocks -= rate[:, None, None, None, None] * (
+            mask * system_blocks(rho, self.params.system_dim)
+        )
+
+        return drho.reshape(-1)
+
+    def iter_evolution(self, decimation: int = 1
+                       ) -> Iterator[Tuple[float, np.ndarray]]:
+        """
+        Time-evolve the whole stack, yielding (t, ρ stack) as computed.
+
+        Per-member information is recorded in self.histories at every
+        output time; the final time is always yielded.
+        """
+        if decimation < 1:
+            raise ValueError(f"decimation must be >= 1, got {decimation}")
+
+        times = np.arange(0, self.params.t_final, self.params.dt)
+        d_sys = self.params.system_dim
+        last = len(times) - 1
+        self.precision_fallback = None
+
+        def solve(rho0, times):
+            return integrate_ode(
+                lambda t, rho: self.master_equation(rho, t),
+                rho0.reshape(-1),
+                times,
+                method=self.params.integrator,
+                rtol=self.params.rtol,
+                atol=self.params.atol
+            )
+
+        for n, t, rho in iter_precision_guarded(self, solve, self.rho_initial,
+                                                times):
+            info = branch_information(
+                partial_trace(rho, (d_sys, rho.shape[-1] // d_sys), keep=(0,))
+            )
+            for history, info_b in zip(self.histories, info):
+                history.append(t, info_b)
+
+            if n % decimation == 0 or n == last:
+                yield t, rho
+
+    def _set_precision(self, dtype: str):
+        """Continue the whole stack in `dtype`."""
+        self.params = replace(self.params, dtype=dtype)
+        self.template._set_precision(dtype)
+        self.rho_initial = self.rho_initial.astype(dtype)
+        self._rhs_input = None
+
+    def run_measurements(self, observables: Optional[Sequence] = None,
+                         decimation: int = 1) -> List[dict]:
+        """
+        Run every trial in the batch.
+
+        Args:
+            observables: As for DIISimulation.evolve; built-in names are
+                evaluated on the whole stack, callables per member
+            decimation: Keep every n-th point of the dt output grid
+
+        Returns:
+            One result dictionary per member, in the same format as
+            DIISimulation.run_single_measurement
         """
-        outcomes = []
+        d_sys = self.params.system_dim
+        evaluators = resolve_observables(observables, d_sys, stacked=True) \
+            if observables is not None else None
+
+        times, collected, rho_final = collect_outputs(
+            self.iter_evolution(decimation), evaluators,
+            row_shape=(self.batch_size, -1))
 
-        for trial in range(self.n_trials):
+        amplitudes = np.ones(d_sys) / np.sqrt(d_sys)
+        outcomes = select_outcome(amplitudes, self.X_overlaps)
+
+        # Member-major: (B, n_times, ...)
+        if evaluators is None:
+            trajectory = np.swapaxes(collected, 0, 1)
+        else:
+            values = {name: np.swapaxes(v, 0, 1) for name, v in collected.items()}
+
+        results = []
+        for b in range(self.batch_size):
+            result = {
+                'outcome': outcomes[b],
+                'X_overlaps': self.X_overlaps[b],
+                'amplitudes': amplitudes,
+                'times': times,
+                'rho_final': rho_final[b].copy(),
+                'info_history': self.histories[b]
+            }
+            if evaluators is None:
+                result['rho_trajectory'] = trajectory[b]
+            else:
+                result['observables'] = {name: v[b] for name, v in values.items()}
+            results.append(result)
+
+        return results
+
+
+def _run_trial_chunk(params: DIIParameters, seed: np.random.SeedSequence,
+                     first_trial: int, n_trials: int,
+                     observables: Optional[Sequence], decimation: int,
+                     batch_size: Optional[int], mode: str = "dynamics",
+                     traced: Sequence[int] = (),
+                     policy: tuple = ("all", 0, None),
+                     offset: int = 0) -> List[dict]:
+    """
+    Run one chunk of ensemble trials from its own random stream.
+
+    Module-level so it can be sent to worker processes. The chunk's
+    microstates are drawn in trial order from a single Generator, so the
+    results depend only on (params, seed, n_trials), never on which
+    process ran the chunk.
+
+    In "outcomes" mode the selection rule is applied to all microstates of
+    the chunk at once; only trials listed in `traced` (global trial
+    indices) are integrated, with the same microstate.
+
+    With the analytic sampler the chunk's overlaps are drawn first, as one
+    block, in every mode; each trial then completes its state from its own
+    child stream of `seed`. A trial therefore gets the same microstate
+    whether it is integrated or only selected from its overlaps.
+
+    The retention `policy` (see EnsembleResults.policy) is applied to each
+    trial as soon as it finishes, so a chunk never holds more than one
+    full result (one batch with batch_size). `offset` is added to the
+    trial indices the policy sees.
+    """
+    rng = np.random.default_rng(seed)
+    d_sys = params.system_dim
+    d_app = params.apparatus_dim
+    indices = DIISimulation._pointer_indices(d_sys, d_app)
+
+    analytic = params.overlap_sampler == "analytic"
+    if analytic:
+        # Joint overlaps drawn directly, no dim-length vectors
+        X_overlaps = ApparatusMicrostate(d_app, rng).sample_basis_overlaps(
+            n_trials, indices)
+
+    def retain(i, result):
+        return EnsembleResults.retain(policy, offset + first_trial + i, result,
+                                      chunk=offset + first_trial)
+
+    def microstate(i):
+        """Unsampled apparatus for trial i of the chunk."""
+        if not analytic:
+            return ApparatusMicrostate(d_app, rng)
+        trial_seed = np.random.SeedSequence(seed.entropy,
+                                            spawn_key=seed.spawn_key + (i,))
+        apparatus = ApparatusMicrostate(d_app, trial_seed)
+        apparatus.pointer_overlaps = X_overlaps[i]
+        return apparatus
+
+    if mode == "outcomes":
+        if not analytic:
+            states = ApparatusMicrostate(d_app, rng).sample_thermal_states(n_trials)
+
+            # X_i = |⟨A_i|ψ⟩|² for every trial and pointer in one product
+            pointers = np.array([DIISimulation._create_pointer_state(k, d_app)
+                                 for k in range(d_sys)])
+            X_overlaps = np.abs(states @ pointers.conj().T)**2
+
+        # Deterministic selection for every trial at once
+        amplitudes = np.ones(d_sys) / np.sqrt(d_sys)
+        outcomes = select_outcome(amplitudes, X_overlaps)
+
+        results = []
+        for i in range(n_trials):
+            if first_trial + i in traced:
+                apparatus = microstate(i)
+                if not analytic:
+                    apparatus.state = states[i]
+                sim = DIISimulation(params, apparatus=apparatus)
+                result = sim.run_single_measurement(observables, decimation)
+            else:
+                result = {
+                    'outcome': outcomes[i],
+                    'X_overlaps': X_overlaps[i],
+                    'amplitudes': amplitudes
+                }
+            results.append(retain(i, result))
+        return results
+
+    if batch_size is None:
+        results = []
+        for i in range(n_trials):
             # New apparatus microstate each trial (thermal fluctuation)
-            params_trial = DIIParameters(
-                **{k: v for k, v in self.params.__dict__.items()},
+            sim = DIISimulation(params, apparatus=microstate(i))
+            results.append(retain(i, sim.run_single_measurement(observables,
+                                                                decimation)))
+        return results
+
+    results = []
+    for start in range(0, n_trials, batch_size):
+        size = min(batch_size, n_trials - start)
+        members = [microstate(start + i) if analytic else rng for i in range(size)]
+        batch = DIIBatchSimulation(params, members)
+        results.extend(retain(start + i, result) for i, result in
+                       enumerate(batch.run_measurements(observables, decimation)))
+    return results
+
+
+def _observable_names(observables: Optional[Sequence]) -> Optional[tuple]:
+    """Comparable description of an observables argument."""
+    if observables is None:
+        return None
+    return tuple(o if isinstance(o, str) else getattr(o, "__qualname__", repr(o))
+                 for o in observables)
+
+
+class EnsembleResults:
+    """
+    Per-trial results of a DIIEnsemble, kept under a retention policy.
+
+    Policies:
+    - "all":     every result dictionary, as returned by the simulation
+    - "summary": only 'outcome', 'X_overlaps' and 'amplitudes'
+    - "first":   full results for the first `keep_first` trials, summaries
+                 for the rest
+    - "final":   summaries plus 'rho_final'
+    - "disk":    full results appended to one .npz shard per chunk under
+                 `spill_dir` as soon as each trial finishes, and reloaded
+                 on access; nothing is kept in memory
+
+    The policy is applied per trial by the chunk workers (see `retain`),
+    so add_chunk receives results that are already reduced. Behaves as a
+    read-only sequence indexed by trial.
+    """
+
+    RETENTION = ("all", "summary", "first", "final", "disk")
+    SUMMARY_KEYS = ('outcome', 'X_overlaps', 'amplitudes')
+
+    def __init__(self, retention: str = "all", keep_first: int = 0,
+                 spill_dir: Optional[str] = None):
+        if retention not in self.RETENTION:
+            raise ValueError(
+                f"Unknown retention {retention!r}; expected one of {self.RETENTION}"
+            )
+        self.retention = retention
+        self.keep_first = keep_first
+        self.spill_dir = spill_dir
+        self._temporary = retention == "disk" and spill_dir is None
+        if self._temporary:
+            self.spill_dir = tempfile.mkdtemp(prefix="dii_results_")
+
+        self._count = 0
+        self._memory = {}  # trial -> retained dict
+        self._shards = {}  # first trial of a chunk -> its number of trials
+        self._shard_starts = []  # sorted keys of _shards
+
+    @property
+    def policy(self) -> tuple:
+        """(retention, keep_first, spill_dir), picklable for chunk workers."""
+        return (self.retention, self.keep_first, self.spill_dir)
+
+    @classmethod
+    def retain(cls, policy: tuple, trial: int, result: dict,
+               chunk: Optional[int] = None) -> dict:
+        """
+        Reduce one finished trial's result under `policy`.
+
+        With "disk" the full result is appended here to the shard of
+        `chunk` (the first trial of the chunk `trial` belongs to); the
+        summary returned only feeds the ensemble statistics.
+
+        Returns:
+            What is kept of the result
+        """
+        retention, keep_first, spill_dir = policy
+        if retention == "all" or (retention == "first" and trial < keep_first):
+            return result
+        if retention == "disk":
+            cls._write_trial(spill_dir, trial if chunk is None else chunk,
+                             trial, result)
+
+        kept = {key: result[key] for key in cls.SUMMARY_KEYS}
+        if retention == "final" and 'rho_final' in result:
+            kept['rho_final'] = result['rho_final']
+        return kept
+
+    @classmethod
+    def _write_trial(cls, spill_dir: str, chunk: int, trial: int, result: dict):
+        # Trials of a chunk finish in order: the first starts a new shard
+        # (replacing one left by an interrupted run), the rest are appended
+        mode = "w" if trial == chunk else "a"
+        with zipfile.ZipFile(cls._shard_path(spill_dir, chunk), mode) as shard:
+            for name, array in cls._flatten(cls._trial_key(trial), result).items():
+                with shard.open(name + ".npy", "w", force_zip64=True) as f:
+                    np.lib.format.write_array(f, array)
+
+    @staticmethod
+    def _shard_path(spill_dir: str, chunk: int) -> str:
+        return os.path.join(spill_dir, f"chunk_{chunk:09d}.npz")
+
+    @staticmethod
+    def _trial_key(trial: int) -> str:
+        return f"trial_{trial:09d}"
+
+    def restore_spill_dir(self, spill_dir: str):
+        """Continue in the spill_dir of a resumed run, which holds its trials."""
+        if spill_dir == self.spill_dir:
+            return
+        if self._shards:
+            raise ValueError(
+                f"Cannot resume into {spill_dir}: results already spilled to "
+                f"{self.spill_dir}"
             )
-            params_trial.random_seed = (
-                self.params.random_seed + trial
-                if self.params.random_seed is not None
-                else None
+        if self._temporary:
+            os.rmdir(self.spill_dir)  # created empty by __init__
+        self.spill_dir = spill_dir
+        self._temporary = False
+
+    def add_chunk(self, start: int, results: List[dict]):
+        """Store the (already retained) results of trials start, start+1, ... ."""
+        self._count = max(self._count, start + len(results))
+        if self.retention == "disk":
+            # Written by retain into the chunk's shard; only index it
+            if start not in self._shards:
+                bisect.insort(self._shard_starts, start)
+            self._shards[start] = len(results)
+            return
+
+        for i, result in enumerate(results):
+            self._memory[start + i] = result
+
+    @staticmethod
+    def _flatten(prefix: str, result: dict) -> dict:
+        arrays = {}
+        for key, value in result.items():
+            if value is None:
+                continue  # e.g. 'event' when none occurred; not stored
+            if isinstance(value, InformationHistory):
+                arrays[f"{prefix}__{key}__times"] = value.times
+                arrays[f"{prefix}__{key}__values"] = value.values
+            elif isinstance(value, dict):
+                for name, v in value.items():
+                    arrays[f"{prefix}__{key}__{name}"] = np.asarray(v)
+            else:
+                arrays[f"{prefix}__{key}"] = np.asarray(value)
+        return arrays
+
+    @staticmethod
+    def _unflatten(prefix: str, shard) -> dict:
+        result = {}
+        for name in shard.files:
+            if not name.startswith(prefix + "__"):
+                continue
+            parts = name[len(prefix) + 2:].split("__", 1)
+            if len(parts) == 1:
+                value = shard[name]
+                result[parts[0]] = value[()] if value.ndim == 0 else value
+            else:
+                result.setdefault(parts[0], {})[parts[1]] = shard[name]
+
+        if 'info_history' in result:
+            history = result['info_history']
+            result['info_history'] = InformationHistory.from_arrays(
+                history['times'], history['values'])
+        return result
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, trial: int) -> dict:
+        if trial < 0:
+            trial += self._count
+        if not 0 <= trial < self._count:
+            raise IndexError(f"trial {trial} out of range")
+
+        if self.retention != "disk":
+            return self._memory[trial]
+
+        chunk = self._shard_starts[bisect.bisect_right(self._shard_starts, trial) - 1]
+        with np.load(self._shard_path(self.spill_dir, chunk)) as stored:
+            return self._unflatten(self._trial_key(trial), stored)
+
+    def __iter__(self) -> Iterator[dict]:
+        if self.retention != "disk":
+            for trial in range(self._count):
+                yield self[trial]
+            return
+
+        # Open every shard once
+        for chunk in self._shard_starts:
+            with np.load(self._shard_path(self.spill_dir, chunk)) as stored:
+                for trial in range(chunk, chunk + self._shards[chunk]):
+                    yield self._unflatten(self._trial_key(trial), stored)
+
+
+class EnsembleCheckpoint:
+    """
+    Append-only checkpoint file for a DIIEnsemble run.
+
+    The file is a stream of pickles: a header describing the run (including
+    the SeedSequence entropy every chunk stream is spawned from), then one
+    (first trial, results) record per completed chunk, flushed to disk as
+    soon as the chunk finishes. A record cut short by an interruption is
+    discarded on load, so at most the chunks in flight are lost.
+
+    Records hold the results as retained by the ensemble's policy. With
+    the default retention="all" every full result, trajectories and
+    histories included, is pickled into this one file, which grows with
+    the run; use "summary", "final" or "disk" (whose records are
+    summaries) to keep long checkpointed runs small.
+    """
+
+    # Header keys taken from the saved run on resume instead of compared
+    RESTORED = ('entropy', 'spill_dir')
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self, header: dict) -> Tuple[Optional[dict], List[Tuple[int, List[dict]]]]:
+        """
+        Read the saved header and completed chunks.
+
+        Args:
+            header: Header of the run being resumed; every key except
+                those in RESTORED must match the saved one
+
+        Returns:
+            (saved header, [(first trial, results), ...]), or (None, [])
+            if there is no checkpoint yet
+        """
+        if not os.path.exists(self.path):
+            return None, []
+
+        records = []
+        with open(self.path, "rb") as f:
+            try:
+                saved = pickle.load(f)
+            except (EOFError, pickle.UnpicklingError):
+                return None, []
+            good = f.tell()
+            while True:
+                try:
+                    records.append(pickle.load(f))
+                except (EOFError, pickle.UnpicklingError):
+                    break
+                good = f.tell()
+
+        mismatched = [key for key in header
+                      if key not in self.RESTORED and saved.get(key) != header[key]]
+        if mismatched:
+            raise ValueError(
+                f"Checkpoint {self.path} was written by a different run "
+                f"(mismatched: {', '.join(mismatched)})"
             )
 
-            # Run simulation
-            sim = DIISimulation(params_trial)
-            result = sim.run_single_measurement()
+        # Drop a partially written trailing record before appending
+        with open(self.path, "r+b") as f:
+            f.truncate(good)
+        return saved, records
+
+    def start(self, header: dict):
+        """Begin a new checkpoint file, replacing any existing one."""
+        with open(self.path, "wb") as f:
+            pickle.dump(header, f)
+            f.flush()
+            os.fsync(f.fileno())
 
-            outcomes.append(result['outcome'])
-            self.results.append(result)
+    def append(self, start: int, results: List[dict]):
+        """Record a completed chunk."""
+        with open(self.path, "ab") as f:
+            pickle.dump((start, results), f)
+            f.flush()
+            os.fsync(f.fileno())
 
-            if verbose and (trial + 1) % 100 == 0:
-                print(f"Completed {trial + 1}/{self.n_trials} trials")
 
-        # Compute statistics
-        outcomes = np.array(outcomes)
+class DIIEnsemble:
+    """
+    Run ensemble of measurements to verify Born rule statistics.
+
+    Trials are grouped into chunks of `chunk_size`. Each chunk draws its
+    microstates from its own stream, spawned from
+    SeedSequence(params.random_seed), so streams of nearby base seeds do
+    not overlap and results are identical however the chunks are
+    distributed over worker processes.
+    """
+
+    def __init__(self, params: DIIParameters, n_trials: int = 1000,
+                 chunk_size: int = 100, retention: str = "all",
+                 keep_first: int = 0, spill_dir: Optional[str] = None):
+        """
+        Args:
+            params: Simulation parameters (random_seed is the base seed)
+            n_trials: Number of trials per run_ensemble call
+            chunk_size: Trials per chunk (unit of seeding and distribution)
+            retention: How much of each trial result to keep in
+                self.results; see EnsembleResults
+            keep_first: Number of full results kept with retention="first"
+            spill_dir: Directory for retention="disk" (default: a new
+                temporary directory)
+        """
+        self.params = params
+        self.n_trials = n_trials
+        self.chunk_size = chunk_size
+        self.results = EnsembleResults(retention, keep_first, spill_dir)
+
+    def run_ensemble(self, verbose: bool = True,
+                     observables: Optional[Sequence] = None,
+                     decimation: int = 1,
+                     batch_size: Optional[int] = None,
+                     workers: Optional[int] = None,
+                     mode: str = "dynamics",
+                     traced: Optional[Sequence[int]] = None,
+                     checkpoint: Optional[str] = None,
+                     resume: bool = False) -> dict:
+        """
+        Run N independent measurement trials.
+
+        Each trial has different apparatus microstate (thermal fluctuations).
+
+        The outcome depends only on the microstate overlaps and the
+        amplitudes, so mode="outcomes" skips the master equation: it
+        samples each chunk's microstates and applies the selection rule to
+        all of them in one vectorized pass. Trials listed in `traced` are
+        still integrated (with the same microstate) and get full results;
+        the others only carry 'outcome', 'X_overlaps' and 'amplitudes'.
+
+        With `checkpoint` set, every completed chunk is appended to that
+        file (see EnsembleCheckpoint). Passing resume=True with the same
+        arguments reloads the completed chunks and runs only the missing
+        ones; since every chunk has its own seed stream, the outcome is
+        identical to an uninterrupted run. With retention="disk" the
+        resumed run continues in the saved run's spill_dir.
+
+        Args:
+            verbose: Print progress as chunks complete
+            observables: Record these per trial instead of the full
+                trajectory (see DIISimulation.evolve); must be picklable
+                (names or module-level functions) when workers > 1
+            decimation: Keep every n-th point of the dt output grid
+            batch_size: If given, evolve this many trials at a time as one
+                stacked integration (DIIBatchSimulation)
+            workers: Number of worker processes; None or 1 runs in-process
+            mode: "dynamics" (integrate every trial) or "outcomes"
+            traced: Trial indices to integrate in "outcomes" mode
+            checkpoint: Path of the checkpoint file (None disables it)
+            resume: Continue from `checkpoint` if it exists instead of
+                starting over
+
+        Returns:
+            Statistics dictionary
+        """
+        if mode not in ("dynamics", "outcomes"):
+            raise ValueError(
+                f"Unknown mode {mode!r}; expected 'dynamics' or 'outcomes'"
+            )
+        DIISimulation._check_overlap_sampler(self.params)
+        traced = frozenset(traced or ())
         d_sys = self.params.system_dim
+        outcomes = np.empty(self.n_trials, dtype=int)
+        counts = np.zeros(d_sys, dtype=int)
+        offset = len(self.results)
+        completed = 0
+
+        def merge(start, chunk_results):
+            nonlocal completed, counts
+            chunk_outcomes = [result['outcome'] for result in chunk_results]
+            stop = start + len(chunk_results)
+
+            # Merge statistics as chunks arrive (in any order)
+            outcomes[start:stop] = chunk_outcomes
+            counts += np.bincount(chunk_outcomes, minlength=d_sys)
+            self.results.add_chunk(offset + start, chunk_results)
+            completed += len(chunk_results)
+
+        # Every chunk stream is spawned from this entropy; it is saved in
+        # the checkpoint so that unseeded runs also resume identically
+        entropy = np.random.SeedSequence(self.params.random_seed).entropy
+        done = set()
+        store = None
+
+        if checkpoint is not None:
+            store = EnsembleCheckpoint(checkpoint)
+            header = {
+                'params': self.params,
+                'n_trials': self.n_trials,
+                'chunk_size': self.chunk_size,
+                'mode': mode,
+                'traced': traced,
+                'observables': _observable_names(observables),
+                'decimation': decimation,
+                'batch_size': batch_size,
+                'retention': self.results.policy[:2],
+                # Resuming "disk" needs the shards of the completed trials
+                'spill_dir': self.results.spill_dir,
+                'entropy': entropy,
+            }
+            saved, records = store.load(header) if resume else (None, [])
+
+            if saved is None:
+                store.start(header)
+            else:
+                entropy = saved['entropy']
+                if self.results.retention == "disk":
+                    self.results.restore_spill_dir(saved['spill_dir'])
+                for start, chunk_results in records:
+                    merge(start, chunk_results)
+                    done.add(start)
+                if verbose:
+                    print(f"Resumed {completed}/{self.n_trials} trials "
+                          f"from {checkpoint}")
+
+        for start, chunk_results in self._iter_chunks(observables, decimation,
+                                                      batch_size, workers,
+                                                      mode, traced,
+                                                      entropy, done, offset):
+            merge(start, chunk_results)
+            if store is not None:
+                store.append(start, chunk_results)
+
+            if verbose:
+                print(f"Completed {completed}/{self.n_trials} trials")
 
         # Empirical frequencies
-        freq_empirical = np.array([
-            np.sum(outcomes == k) / self.n_trials
-            for k in range(d_sys)
-        ])
+        freq_empirical = counts / self.n_trials
 
         # Born rule prediction (uniform superposition)
         freq_born = np.ones(d_sys) / d_sys
@@ -594,6 +3279,43 @@ class DIIEnsemble:
             'n_trials': self.n_trials
         }
 
+    def _chunks(self, entropy=None) -> List[Tuple[int, int, np.random.SeedSequence]]:
+        """(first trial, number of trials, seed) for every chunk."""
+        if entropy is None:
+            entropy = self.params.random_seed
+        starts = range(0, self.n_trials, self.chunk_size)
+        seeds = np.random.SeedSequence(entropy).spawn(len(starts))
+        return [(start, min(self.chunk_size, self.n_trials - start), seed)
+                for start, seed in zip(starts, seeds)]
+
+    def _iter_chunks(self, observables: Optional[Sequence], decimation: int,
+                     batch_size: Optional[int], workers: Optional[int],
+                     mode: str = "dynamics", traced: frozenset = frozenset(),
+                     entropy=None, skip: frozenset = frozenset(),
+                     offset: int = 0) -> Iterator[Tuple[int, List[dict]]]:
+        """Yield (first trial, results) per chunk not in `skip`, in
+        completion order."""
+        chunks = [chunk for chunk in self._chunks(entropy)
+                  if chunk[0] not in skip]
+
+        def chunk_args(start, n, seed):
+            chunk_traced = tuple(t for t in traced if start <= t < start + n)
+            return (self.params, seed, start, n, observables, decimation,
+                    batch_size, mode, chunk_traced, self.results.policy, offset)
+
+        if workers is None or workers <= 1:
+            for start, n, seed in chunks:
+                yield start, _run_trial_chunk(*chunk_args(start, n, seed))
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_run_trial_chunk, *chunk_args(start, n, seed)): start
+                for start, n, seed in chunks
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
     def _chi_squared_test(self, observed: np.ndarray,
                           expected: np.ndarray) -> float:
         """Compute χ² statistic."""
@@ -603,12 +3325,16 @@ class DIIEnsemble:
         return chi2
 
 
-def demonstrate_born_rule_convergence():
+def demonstrate_born_rule_convergence(checkpoint_dir: Optional[str] = None):
     """
     Demonstrate Born rule emergence from typicality.
 
     Show that as apparatus dimension N → ∞,
     Beta(1, N-1) → Exp(1) → Born rule frequencies.
+
+    Args:
+        checkpoint_dir: If given, checkpoint each ensemble there and resume
+            any sweep interrupted earlier
     """
     print("=" * 60)
     print("Born Rule Convergence Demonstration")
@@ -628,8 +3354,15 @@ def demonstrate_born_rule_convergence():
             random_seed=42
         )
 
+        checkpoint = None
+        if checkpoint_dir is not None:
+            checkpoint = os.path.join(checkpoint_dir, f"born_rule_N{dim}.ckpt")
+
+        # The selection rule only needs the microstates; integrating 5000
+        # trajectories per dimension would not change the outcomes
         ensemble = DIIEnsemble(params, n_trials=n_trials)
-        stats = ensemble.run_ensemble(verbose=False)
+        stats = ensemble.run_ensemble(verbose=False, mode="outcomes",
+                                      checkpoint=checkpoint, resume=True)
 
         print(f"Empirical frequencies: {stats['frequencies']}")
         print(f"Born rule prediction:  {stats['born_rule']}")
@@ -661,19 +3394,22 @@ if __name__ == "__main__":
 
     print("\nRunning single measurement...")
     sim = DIISimulation(params)
-    result = sim.run_single_measurement()
+    result = sim.run_single_measurement(observables=["populations", "purity"])
 
     print(f"Outcome: {result['outcome']}")
     print(f"System amplitudes: {result['amplitudes']}")
     print(f"Apparatus overlaps X_i: {result['X_overlaps']}")
     print(f"Selection weights |c_i|² X_i: {np.abs(result['amplitudes'])**2 * result['X_overlaps']}")
+    print(f"Final populations: {result['observables']['populations'][-1]}")
+    print(f"Final purity: {result['observables']['purity'][-1]:.4f}")
 
     print("\n" + "=" * 60)
     print("Running ensemble to verify Born rule...")
     print("=" * 60)
 
+    # Outcomes only: the selection rule does not need the trajectories
     ensemble = DIIEnsemble(params, n_trials=1000)
-    stats = ensemble.run_ensemble(verbose=True)
+    stats = ensemble.run_ensemble(verbose=True, mode="outcomes")
 
     print("\n" + "=" * 60)
     print("RESULTS")
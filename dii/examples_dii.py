@@ -63,8 +63,10 @@ def example_1_single_measurement():
     print("\nRunning simulation...")
     start_time = time.time()
 
+    # Record observables on the fly; the full ρ(t) would need
+    # 1000 × 200² complex values
     sim = DIISimulation(params)
-    result = sim.run_single_measurement()
+    result = sim.run_single_measurement(observables=["populations", "purity"])
 
     elapsed = time.time() - start_time
     print(f"Completed in {elapsed:.2f} seconds")
@@ -75,6 +77,8 @@ def example_1_single_measurement():
     print(f"  System amplitudes:    {result['amplitudes']}")
     print(f"  Apparatus overlaps:   {result['X_overlaps']}")
     print(f"  Selection weights:    {np.abs(result['amplitudes'])**2 * result['X_overlaps']}")
+    print(f"  Final populations:    {result['observables']['populations'][-1]}")
+    print(f"  Final purity:         {result['observables']['purity'][-1]:.4f}")
 
     # Visualize if matplotlib available
     try:
@@ -107,12 +111,13 @@ def example_2_born_rule_verification():
     n_trials = 2000
 
     print(f"\nRunning {n_trials} independent measurements...")
-    print("(This may take a minute...)")
 
     start_time = time.time()
 
+    # The selection rule only needs the microstates; integrating every
+    # trajectory would not change the outcomes
     ensemble = DIIEnsemble(params, n_trials=n_trials)
-    stats = ensemble.run_ensemble(verbose=True)
+    stats = ensemble.run_ensemble(verbose=True, mode="outcomes")
 
     elapsed = time.time() - start_time
     print(f"\nCompleted in {elapsed:.2f} seconds ({elapsed/n_trials*1000:.1f} ms/trial)")
@@ -181,7 +186,7 @@ def example_3_apparatus_dimension_convergence():
         )
 
         ensemble = DIIEnsemble(params, n_trials=n_trials)
-        stats = ensemble.run_ensemble(verbose=False)
+        stats = ensemble.run_ensemble(verbose=False, mode="outcomes")
 
         # Compute deviation
         deviation = np.max(np.abs(stats['frequencies'] - stats['born_rule']))
@@ -242,8 +247,9 @@ def example_4_information_dynamics():
 
     print("\nRunning simulation to track information flow...")
 
+    # info_history is recorded either way; keep observables, not ρ(t)
     sim = DIISimulation(params)
-    result = sim.run_single_measurement()
+    result = sim.run_single_measurement(observables=["populations"])
 
     # Extract information history
     info_history = result['info_history']
@@ -252,15 +258,16 @@ def example_4_information_dynamics():
         print("No information history recorded.")
         return
 
-    times = np.array([t for t, _ in info_history])
-    info_0 = np.array([info[0] for _, info in info_history])
-    info_1 = np.array([info[1] for _, info in info_history])
+    times = info_history.times
+    info_0 = info_history.values[:, 0]
+    info_1 = info_history.values[:, 1]
     info_gap = np.abs(info_0 - info_1)
 
     print(f"\nFinal outcome: {result['outcome']}")
     print(f"Initial info:  I_0={info_0[0]:.3f}, I_1={info_1[0]:.3f}")
     print(f"Final info:    I_0={info_0[-1]:.3f}, I_1={info_1[-1]:.3f}")
     print(f"Final gap:     ΔI={info_gap[-1]:.3f} (threshold: {params.threshold})")
+    print(f"Final populations: {result['observables']['populations'][-1]}")
 
     # Find threshold crossing time
     threshold_crossed = info_gap > params.threshold
@@ -295,23 +302,15 @@ def example_5_apparatus_microstate_distribution():
     print(f"Number of samples:   {n_samples}")
     print("\nSampling apparatus microstates...")
 
-    overlaps_all = []
+    # All microstates in one (n_samples, dim) block
+    states = ApparatusMicrostate(dim, seed=None).sample_thermal_states(n_samples)
 
-    for i in range(n_samples):
-        apparatus = ApparatusMicrostate(dim, seed=None)
-        apparatus.sample_thermal_state()
+    # Fixed pointer state (basis vector)
+    pointer = np.eye(dim)[0]
+    overlaps = np.abs(states @ pointer.conj())**2
 
-        # Fixed pointer state (basis vector)
-        pointer = np.eye(dim)[0]
-        overlap = np.abs(np.vdot(pointer, apparatus.state))**2
-
-        # Rescale by dimension for Exp(1)
-        overlaps_all.append(overlap * dim)
-
-        if (i + 1) % 1000 == 0:
-            print(f"  {i + 1}/{n_samples} samples")
-
-    overlaps_all = np.array(overlaps_all)
+    # Rescale by dimension for Exp(1)
+    overlaps_all = overlaps * dim
 
     # Statistical test
     from scipy.stats import kstest
@@ -357,9 +356,9 @@ def visualize_trajectory(result):
         print("No trajectory data to visualize")
         return
 
-    info_times = np.array([t for t, _ in info_history])
-    info_0 = np.array([info[0] for _, info in info_history])
-    info_1 = np.array([info[1] for _, info in info_history])
+    info_times = info_history.times
+    info_0 = info_history.values[:, 0]
+    info_1 = info_history.values[:, 1]
 
     # Plot 1: Information functionals
     axes[0, 0].plot(info_times, info_0, label='I₀(t)', linewidth=2)
@@ -11,6 +11,7 @@ Test categories:
 4. Physics validation (conservation laws, no-signaling)
 """
 
+import os
 import unittest
 import numpy as np
 from scipy.stats import chi2, kstest, expon
@@ -22,7 +23,12 @@ from dii_framework import (
     InformationFunctional,
     CollapseDynamics,
     DIISimulation,
-    DIIEnsemble
+    DIIEnsemble,
+    DIIBatchSimulation,
+    DIIQuantumTrajectories,
+    DephasedPureState,
+    OperatorCache,
+    partial_trace
 )
 
 
@@ -85,6 +91,42 @@ class TestApparatusMicrostate(unittest.TestCase):
         overlaps_full = self.apparatus.compute_overlaps(pointer_full)
         self.assertAlmostEqual(np.sum(overlaps_full), 1.0, places=10)
 
+    def test_batched_sampling_matches_sequential(self):
+        """Test sample_thermal_states draws the same states as repeated calls."""
+        sequential = ApparatusMicrostate(self.dim, seed=7)
+        batched = ApparatusMicrostate(self.dim, seed=7)
+
+        states = batched.sample_thermal_states(5)
+
+        self.assertEqual(states.shape, (5, self.dim))
+        self.assertTrue(np.allclose(np.linalg.norm(states, axis=1), 1.0))
+        for state in states:
+            self.assertTrue(np.allclose(state, sequential.sample_thermal_state()))
+        self.assertIsNone(batched.state)
+
+        # Array of pointers gives the same overlaps as a list of vectors
+        pointers = np.eye(self.dim)[:3]
+        self.assertTrue(np.allclose(sequential.compute_overlaps(pointers),
+                                    sequential.compute_overlaps(list(pointers))))
+
+    def test_analytic_overlaps_match_haar_marginals(self):
+        """Test Dirichlet overlap sampling against Beta(1, N-1) marginals."""
+        from scipy.stats import beta
+        apparatus = ApparatusMicrostate(self.dim, seed=3)
+
+        X = apparatus.sample_basis_overlaps(2000, [0, 1, 1])
+
+        self.assertEqual(X.shape, (2000, 3))
+        self.assertTrue(np.array_equal(X[:, 1], X[:, 2]))
+        self.assertTrue(np.all(X.sum(axis=1)[:, None] >= X[:, :2]))
+        _, p_value = kstest(X[:, 0], beta(1, self.dim - 1).cdf)
+        self.assertGreater(p_value, 0.01)
+
+        # A state completed around the overlaps reproduces them
+        state = apparatus.sample_state_with_overlaps(X[0, :2], [0, 1])
+        self.assertAlmostEqual(np.linalg.norm(state), 1.0, places=10)
+        self.assertTrue(np.allclose(np.abs(state[:2])**2, X[0, :2]))
+
     def test_haar_distribution_exponential(self):
         """
         Test that overlaps follow exponential distribution.
@@ -148,6 +190,43 @@ class TestInformationFunctional(unittest.TestCase):
         self.assertEqual(len(info), self.params.system_dim)
         self.assertTrue(np.all(info >= 0))
 
+    def test_partial_trace_matches_explicit_sum(self):
+        """Test vectorized partial trace against the explicit index sum."""
+        rng = np.random.default_rng(0)
+        d_sys, d_app = 3, 4
+        A = rng.normal(size=(12, 12)) + 1j * rng.normal(size=(12, 12))
+        rho = A @ A.conj().T
+
+        expected = np.zeros((d_sys, d_sys), dtype=complex)
+        for i in range(d_sys):
+            for j in range(d_sys):
+                for k in range(d_app):
+                    expected[i, j] += rho[i * d_app + k, j * d_app + k]
+
+        self.assertTrue(np.allclose(
+            partial_trace(rho, (d_sys, d_app), keep=(0,)), expected))
+
+        # Keeping the apparatus traces out the system instead
+        expected_app = sum(
+            rho[i * d_app:(i + 1) * d_app, i * d_app:(i + 1) * d_app]
+            for i in range(d_sys)
+        )
+        self.assertTrue(np.allclose(
+            partial_trace(rho, (d_sys, d_app), keep=(1,)), expected_app))
+
+    def test_partial_trace_batched(self):
+        """Test partial trace over a stack of density matrices."""
+        rng = np.random.default_rng(1)
+        stack = rng.normal(size=(5, 2, 20, 20)) + 0j
+
+        reduced = partial_trace(stack, (2, 10), keep=(0,))
+        self.assertEqual(reduced.shape, (5, 2, 2, 2))
+        self.assertTrue(np.allclose(
+            reduced[3, 1], partial_trace(stack[3, 1], (2, 10), keep=(0,))))
+
+        info = self.info_func.compute(stack[:, 0], t=0.0)
+        self.assertEqual(info.shape, (5, self.params.system_dim))
+
     def test_information_growth(self):
         """Test that information grows with decoherence."""
         # This would require full simulation
@@ -157,16 +236,44 @@ class TestInformationFunctional(unittest.TestCase):
     def test_information_gap(self):
         """Test information gap computation."""
         # Manually add history
-        self.info_func.history = [
-            (0.0, np.array([0.5, 0.3])),
-            (1.0, np.array([0.8, 0.2])),
-            (2.0, np.array([0.95, 0.05]))
-        ]
+        self.info_func.record(0.0, np.array([0.5, 0.3]))
+        self.info_func.record(1.0, np.array([0.8, 0.2]))
+        self.info_func.record(2.0, np.array([0.95, 0.05]))
 
         gap, winner = self.info_func.get_information_gap()
 
         self.assertEqual(winner, 0)
         self.assertAlmostEqual(gap, 0.95 - 0.05)
+        self.assertEqual(len(self.info_func.history), 3)
+        self.assertTrue(np.allclose(self.info_func.history.times, [0.0, 1.0, 2.0]))
+
+    def test_history_recorded_at_output_times_only(self):
+        """Test history holds one record per output time, not per RHS call."""
+        params = DIIParameters(system_dim=2, apparatus_dim=6, t_final=2.0,
+                               dt=0.1, random_seed=42)
+        sim = DIISimulation(params)
+        times, _ = sim.evolve()
+
+        self.assertEqual(len(sim.info_func.history), len(times))
+        self.assertTrue(np.allclose(sim.info_func.history.times, times))
+        self.assertEqual(sim.info_func.history.values.shape, (len(times), 2))
+
+    def test_history_ring_buffer(self):
+        """Test ring-buffer history keeps only the latest records."""
+        params = DIIParameters(system_dim=2, history_length=4)
+        info_func = InformationFunctional(params)
+
+        for step in range(10):
+            info_func.record(float(step), np.array([step, 0.0]))
+
+        self.assertEqual(len(info_func.history), 4)
+        self.assertTrue(np.allclose(info_func.history.times, [6, 7, 8, 9]))
+        self.assertTrue(np.allclose([info for _, info in info_func.history],
+                                    [[6, 0], [7, 0], [8, 0], [9, 0]]))
+
+        # An empty ring could never hold a record
+        with self.assertRaises(ValueError):
+            InformationFunctional(DIIParameters(system_dim=2, history_length=0))
 
 
 class TestCollapseDynamics(unittest.TestCase):
@@ -219,7 +326,7 @@ class TestCollapseDynamics(unittest.TestCase):
         ]
 
         # Set information gap
-        self.info_func.history = [(0.0, np.array([0.8, 0.2]))]
+        self.info_func.record(0.0, np.array([0.8, 0.2]))
 
         # Compute collapse term
         drho = self.collapse.lindblad_collapse_term(rho, projectors)
@@ -239,7 +346,7 @@ class TestCollapseDynamics(unittest.TestCase):
             for i in range(2)
         ]
 
-        self.info_func.history = [(0.0, np.array([0.7, 0.3]))]
+        self.info_func.record(0.0, np.array([0.7, 0.3]))
 
         drho = self.collapse.lindblad_collapse_term(rho, projectors)
 
@@ -247,7 +354,27 @@ class TestCollapseDynamics(unittest.TestCase):
         self.assertTrue(np.allclose(drho, drho.conj().T))
 
 
-class TestDIISimulation(unittest.TestCase):
+class SimulationTestCase(unittest.TestCase):
+    """Shared checks for tests comparing evolutions."""
+
+    def _count_calls(self, owner, attr):
+        """Count calls to owner.<attr> (dotted); returns the growing list."""
+        *path, name = attr.split(".")
+        for part in path:
+            owner = getattr(owner, part)
+        calls = []
+        method = getattr(owner, name)
+        setattr(owner, name, lambda *args: calls.append(1) or method(*args))
+        return calls
+
+    def _assert_observables_close(self, a, b, atol):
+        """Every observable series in `a` matches `b` to within atol."""
+        self.assertEqual(set(a), set(b))
+        for name in a:
+            self.assertTrue(np.allclose(a[name], b[name], atol=atol), name)
+
+
+class TestDIISimulation(SimulationTestCase):
     """Test full DII simulation."""
 
     def setUp(self):
@@ -316,6 +443,379 @@ class TestDIISimulation(unittest.TestCase):
                     # Note: only for system projectors, not full space
                     pass
 
+    def test_block_backend_matches_dense(self):
+        """Test block-structured RHS agrees with the dense master equation."""
+        rng = np.random.default_rng(7)
+        params = DIIParameters(system_dim=3, apparatus_dim=6, random_seed=42)
+        dim = params.system_dim * params.apparatus_dim
+
+        A = rng.normal(size=(dim, dim)) + 1j * rng.normal(size=(dim, dim))
+        rho = A @ A.conj().T
+        rho /= np.trace(rho)
+
+        drho_dense = DIISimulation(params).master_equation(rho.flatten(), 0.0)
+
+        params.backend = "block"
+        drho_block = DIISimulation(params).master_equation(rho.flatten(), 0.0)
+
+        self.assertTrue(np.allclose(drho_block, drho_dense, atol=1e-12))
+
+    def test_sparse_backend_matches_dense(self):
+        """Test sparse operators give the same RHS with O(nnz) storage."""
+        rng = np.random.default_rng(8)
+        params = DIIParameters(system_dim=2, apparatus_dim=8, random_seed=42)
+        dim = params.system_dim * params.apparatus_dim
+
+        A = rng.normal(size=(dim, dim)) + 1j * rng.normal(size=(dim, dim))
+        rho = A @ A.conj().T
+        rho /= np.trace(rho)
+
+        drho_dense = DIISimulation(params).master_equation(rho.flatten(), 0.0)
+
+        params.backend = "sparse"
+        sim = DIISimulation(params)
+        drho_sparse = sim.master_equation(rho.flatten(), 0.0)
+
+        self.assertTrue(np.allclose(drho_sparse, drho_dense, atol=1e-12))
+        self.assertLessEqual(sim.hamiltonian.nnz, params.system_dim)
+        self.assertEqual(sim.projectors[0].nnz, params.apparatus_dim)
+
+    def test_reduced_model_matches_full_model(self):
+        """Test the lumped (n_pointers + 1) apparatus gives the same dynamics."""
+        observables = ["populations", "coherences", "purity", "information_gap"]
+        params = DIIParameters(system_dim=2, apparatus_dim=12, t_final=5.0,
+                               dt=0.1, random_seed=3, rtol=1e-10, atol=1e-12)
+        _, full = DIISimulation(params).evolve(observables=observables)
+
+        params.reduced_model = True
+        sim = DIISimulation(params)
+        _, reduced = sim.evolve(observables=observables)
+
+        self.assertEqual(sim.params.apparatus_dim, params.system_dim + 1)
+        self._assert_observables_close(reduced, full, atol=1e-8)
+
+        # Cost no longer depends on apparatus_dim
+        params = DIIParameters(system_dim=2, apparatus_dim=10**6, t_final=1.0,
+                               dt=0.1, random_seed=3, reduced_model=True,
+                               overlap_sampler="analytic")
+        result = DIISimulation(params).run_single_measurement()
+        self.assertEqual(result['rho_final'].shape, (6, 6))
+        self.assertAlmostEqual(np.trace(result['rho_final']).real, 1.0, places=6)
+
+    def test_pure_state_hybrid_matches_density_matrix(self):
+        """Test pure-until-mixed evolution against the full ρ evolution."""
+        observables = ["populations", "coherences", "purity", "information_gap"]
+        params = DIIParameters(system_dim=3, apparatus_dim=10, t_final=20.0,
+                               dt=0.1, random_seed=5, decoherence_rate=0.01,
+                               threshold=0.05, rtol=1e-10, atol=1e-12)
+        _, full = DIISimulation(params).evolve(observables=observables)
+
+        # 1.0 never switches (Tr ρ² >= 1/d_S); 0.05 switches mid-run
+        for tolerance, final_type in ((1.0, DephasedPureState), (0.05, np.ndarray)):
+            params.pure_state_tolerance = tolerance
+            sim = DIISimulation(params)
+            _, hybrid = sim.evolve(observables=observables)
+
+            self.assertIsInstance(sim.rho_final, final_type)
+            self.assertIsNone(sim._rho_initial)
+            self._assert_observables_close(hybrid, full, atol=1e-8)
+
+        state = DIISimulation(params)._iter_pure_evolution(np.array([0.0, 1.0]))
+        state = list(state)[-1]
+        rho = np.asarray(state)
+        self.assertAlmostEqual(state.purity(), np.trace(rho @ rho).real, places=12)
+
+    def test_lowrank_integrator_matches_density_matrix(self):
+        """Test ρ = L L† stepping against the full ρ evolution."""
+        observables = ["populations", "coherences", "purity", "information_gap"]
+        params = DIIParameters(system_dim=3, apparatus_dim=10, t_final=20.0,
+                               dt=0.1, random_seed=5, decoherence_rate=0.01,
+                               threshold=0.05, rtol=1e-10, atol=1e-12)
+        _, full = DIISimulation(params).evolve(observables=observables)
+
+        params.integrator = "lowrank"
+        sim = DIISimulation(params)
+        _, lowrank = sim.evolve(observables=observables)
+
+        self._assert_observables_close(lowrank, full, atol=1e-8)
+        # Exact rank never exceeds d_S, so nothing is discarded
+        self.assertLessEqual(sim.rho_final.rank, params.system_dim)
+        self.assertLess(sim.truncation_error, 1e-12)
+
+        # A rank cap below d_S truncates and reports the discarded weight
+        params.max_rank = 1
+        sim = DIISimulation(params)
+        sim.evolve(observables=["trace"])
+        self.assertEqual(sim.rho_final.rank, 1)
+        self.assertGreater(sim.truncation_error, 1e-3)
+
+    def test_stop_events_end_the_run(self):
+        """Test threshold, F-level and stationarity events stop evolve()."""
+        params = DIIParameters(system_dim=3, apparatus_dim=6, t_final=20.0,
+                               dt=0.1, random_seed=5, threshold=1e-3)
+        _, full = DIISimulation(params).evolve(observables=["information_gap"])
+
+        params.stop_events = ("threshold",)
+        result = DIISimulation(params).run_single_measurement(
+            observables=["information_gap"])
+
+        # Stops at the first output time past the crossing, with the
+        # crossing time interpolated inside the last interval
+        n_event = int(np.argmax(full["information_gap"] >= params.threshold))
+        self.assertEqual(result['event'], "threshold")
+        self.assertEqual(len(result['times']), n_event + 1)
+        self.assertGreater(result['event_time'], result['times'][-2])
+        self.assertLessEqual(result['event_time'], result['times'][-1])
+
+        params.stop_events = ("collapse",)
+        params.collapse_level = 0.5
+        result = DIISimulation(params).run_single_measurement()
+        self.assertEqual(result['event'], "collapse")
+        self.assertLess(result['event_time'], params.t_final)
+
+        # Without coupling, dephasing relaxes ρ to a fixed point
+        params = DIIParameters(system_dim=2, apparatus_dim=6, t_final=200.0,
+                               dt=0.5, random_seed=5, coupling_strength=0.0,
+                               stop_events=("stationary",),
+                               stationary_tolerance=1e-4)
+        result = DIISimulation(params).run_single_measurement(observables=["trace"])
+        self.assertEqual(result['event'], "stationary")
+        self.assertLess(result['times'][-1], 100.0)
+
+        params.stop_events = ("never",)
+        with self.assertRaises(ValueError):
+            DIISimulation(params).evolve()
+
+    def test_fused_rhs_matches_term_by_term(self):
+        """Test the in-place dense RHS against the separate Lindblad terms."""
+        rng = np.random.default_rng(1)
+        params = DIIParameters(system_dim=3, apparatus_dim=8, random_seed=2,
+                               collapse_rate=2.0, threshold=0.01)
+        sim = DIISimulation(params)
+        dim = params.system_dim * params.apparatus_dim
+
+        A = rng.normal(size=(dim, dim)) + 1j * rng.normal(size=(dim, dim))
+        rho = A @ A.conj().T
+        rho /= np.trace(rho)
+
+        out = np.empty(dim * dim, dtype=complex)
+        drho = sim.master_equation(rho.flatten(), 0.3, out=out)
+        self.assertIs(drho, out)
+
+        H = sim.hamiltonian
+        expected = -1j * (H @ rho - rho @ H) + sim._decoherence_term(rho)
+        expected += sim.collapse.lindblad_collapse_term(rho, sim.projectors)
+        self.assertGreater(sim.collapse.collapse_functional(
+            sim.info_func.get_information_gap()[0]), 0.0)
+        self.assertTrue(np.allclose(drho, expected.flatten(), atol=1e-14))
+
+    def test_interaction_picture_matches_and_takes_fewer_steps(self):
+        """Test analytic phases + integrated dissipator at strong coupling."""
+        observables = ["populations", "coherences", "purity", "information_gap"]
+        params = DIIParameters(system_dim=3, apparatus_dim=6, t_final=5.0,
+                               dt=0.1, random_seed=5, coupling_strength=50.0,
+                               threshold=0.01, rtol=1e-9, atol=1e-11)
+
+        sim = DIISimulation(params)
+        schrodinger_calls = self._count_calls(sim, "info_func.compute_reduced")
+        _, schrodinger = sim.evolve(observables=observables)
+
+        params.interaction_picture = True
+        sim = DIISimulation(params)
+        interaction_calls = self._count_calls(sim, "info_func.compute_reduced")
+        _, interaction = sim.evolve(observables=observables)
+
+        self._assert_observables_close(interaction, schrodinger, atol=1e-6)
+        self.assertLess(len(interaction_calls), len(schrodinger_calls) / 3)
+
+        params.integrator = "expm"
+        with self.assertRaises(ValueError):
+            DIISimulation(params).evolve()
+
+    def test_implicit_integrators_handle_strong_collapse(self):
+        """Test BDF and auto-switching at large collapse rates."""
+        observables = ["populations", "coherences", "purity"]
+        params = DIIParameters(system_dim=2, apparatus_dim=6, t_final=5.0,
+                               dt=0.1, random_seed=5, collapse_rate=2000.0,
+                               decoherence_rate=500.0, threshold=0.01)
+
+        sim = DIISimulation(params)
+        explicit_calls = self._count_calls(sim, "master_equation")
+        _, explicit = sim.evolve(observables=observables)
+
+        for integrator in ("BDF", "auto"):
+            params.integrator = integrator
+            sim = DIISimulation(params)
+            implicit_calls = self._count_calls(sim, "master_equation")
+            _, implicit = sim.evolve(observables=observables)
+
+            self._assert_observables_close(implicit, explicit, atol=1e-4)
+            self.assertLess(len(implicit_calls), len(explicit_calls) / 5)
+
+    def test_strang_splitting_matches_rk45(self):
+        """Test the split exact flows against RK45, weak and strong collapse."""
+        observables = ["populations", "coherences", "purity", "information_gap"]
+        for rate in (1.0, 2000.0):
+            params = DIIParameters(system_dim=3, apparatus_dim=6, t_final=5.0,
+                                   dt=0.1, random_seed=5, threshold=0.01,
+                                   collapse_rate=rate, decoherence_rate=rate / 4)
+
+            sim = DIISimulation(params)
+            reference_calls = self._count_calls(sim, "info_func.compute_reduced")
+            _, reference = sim.evolve(observables=observables)
+
+            params.integrator = "strang"
+            sim = DIISimulation(params)
+            split_calls = self._count_calls(sim, "info_func.compute_reduced")
+            _, split = sim.evolve(observables=observables)
+
+            self._assert_observables_close(split, reference, atol=1e-4)
+            if rate > 1:
+                self.assertLess(len(split_calls), len(reference_calls) / 5)
+
+    def test_operator_cache_shares_operators(self):
+        """Test simulations with the same key reuse read-only operators."""
+        cache = OperatorCache()
+        params = DIIParameters(system_dim=2, apparatus_dim=8, random_seed=1)
+        sim_a = DIISimulation(params, operator_cache=cache)
+
+        params_b = DIIParameters(system_dim=2, apparatus_dim=8, random_seed=2,
+                                 collapse_rate=3.0)
+        sim_b = DIISimulation(params_b, operator_cache=cache)
+
+        self.assertIs(sim_a.hamiltonian, sim_b.hamiltonian)
+        self.assertIs(sim_a.projectors, sim_b.projectors)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertFalse(sim_a.hamiltonian.flags.writeable)
+        # The microstate-dependent initial state is still per simulation
+        self.assertFalse(np.allclose(sim_a.rho_initial, sim_b.rho_initial))
+
+        private = DIISimulation(params, operator_cache=None)
+        self.assertIsNot(private.hamiltonian, sim_a.hamiltonian)
+        self.assertTrue(np.array_equal(private.hamiltonian, sim_a.hamiltonian))
+
+        # Block runs cache only the pointer states; H and P_k are built
+        # (and shared with dense runs) only when a path asks for them
+        cache = OperatorCache()
+        params.backend = "block"
+        sim = DIISimulation(params, operator_cache=cache)
+        sim.run_single_measurement(observables=["purity"])
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.nbytes, sim.pointer_matrix.nbytes +
+                         sum(p.nbytes for p in sim.pointer_states))
+        self.assertTrue(np.array_equal(sim.hamiltonian, sim_a.hamiltonian))
+        self.assertEqual(len(sim.projectors), params.system_dim)
+        self.assertEqual(len(cache), 2)
+
+    def test_operator_cache_lru_eviction(self):
+        """Test least recently used entries are evicted over max_bytes."""
+        probe = OperatorCache()
+        DIISimulation(DIIParameters(system_dim=2, apparatus_dim=8),
+                      operator_cache=probe)
+
+        cache = OperatorCache(max_bytes=2 * probe.nbytes)
+        keys = []
+        for g in (1.0, 2.0, 1.0, 3.0):
+            params = DIIParameters(system_dim=2, apparatus_dim=8,
+                                   coupling_strength=g)
+            DIISimulation(params, operator_cache=cache)
+            keys.append(OperatorCache.key(params))
+
+        self.assertEqual(len(cache), 2)
+        self.assertLessEqual(cache.nbytes, cache.max_bytes)
+        self.assertIn(keys[0], cache)       # g=1.0 was used again
+        self.assertNotIn(keys[1], cache)    # g=2.0 was least recently used
+        self.assertIn(keys[3], cache)
+
+    def test_integrators_agree(self):
+        """Test complex RK integrators and split-real odeint agree."""
+        finals = {}
+        for method in ("RK45", "DOP853", "odeint"):
+            params = DIIParameters(system_dim=2, apparatus_dim=5, t_final=2.0,
+                                   dt=0.1, random_seed=42, integrator=method)
+            times, rho_traj = DIISimulation(params).evolve()
+
+            self.assertEqual(len(rho_traj), len(times))
+            self.assertTrue(np.iscomplexobj(rho_traj))
+            finals[method] = rho_traj[-1]
+
+        self.assertTrue(np.allclose(finals["RK45"], finals["DOP853"], atol=1e-5))
+        self.assertTrue(np.allclose(finals["RK45"], finals["odeint"], atol=1e-5))
+
+    def test_expm_propagation_matches_rk45(self):
+        """Test closed-form Liouvillian exponential propagation against RK45."""
+        finals = {}
+        for method in ("RK45", "expm"):
+            params = DIIParameters(system_dim=2, apparatus_dim=6, t_final=3.0,
+                                   dt=0.05, random_seed=42, integrator=method)
+            sim = DIISimulation(params)
+            times, rho_traj = sim.evolve()
+            finals[method] = rho_traj[-1]
+
+        # Linear part is exact; F is piecewise constant over each dt
+        self.assertTrue(np.allclose(finals["expm"], finals["RK45"], atol=1e-4))
+
+        # Liouvillian reproduces the RHS for frozen F
+        rho = sim.rho_initial
+        L_lin, L_collapse = sim.liouvillian()
+        F = sim._collapse_factor(rho, 0.0)
+        drho = sim.master_equation(rho.flatten(), 0.0)
+        self.assertTrue(np.allclose((L_lin + F * L_collapse) @ rho.flatten(), drho))
+
+    def test_unknown_integrator_rejected(self):
+        """Test that an unknown integrator name raises."""
+        params = DIIParameters(system_dim=2, apparatus_dim=4, t_final=1.0,
+                               integrator="euler")
+        with self.assertRaises(ValueError):
+            DIISimulation(params).evolve()
+
+    def test_streamed_observables_match_trajectory(self):
+        """Test on-the-fly observables against the full trajectory."""
+        params = DIIParameters(system_dim=2, apparatus_dim=6, t_final=3.0,
+                               dt=0.05, random_seed=42)
+        dim = params.system_dim * params.apparatus_dim
+        times, rho_traj = DIISimulation(params).evolve()
+
+        sim = DIISimulation(params)
+        times_dec, values = sim.evolve(
+            observables=["populations", "coherences", "purity", "trace",
+                         lambda t, rho: np.abs(rho[0, -1])],
+            decimation=7
+        )
+
+        # Every 7th point plus the final time
+        self.assertTrue(np.allclose(times_dec[:-1], times[::7]))
+        self.assertEqual(times_dec[-1], times[-1])
+
+        rho_last = rho_traj[-1].reshape(dim, dim)
+        rho_sys = partial_trace(rho_last, (2, params.apparatus_dim), keep=(0,))
+        self.assertTrue(np.allclose(values["populations"][-1], np.diag(rho_sys).real))
+        self.assertTrue(np.allclose(values["coherences"][-1], [rho_sys[0, 1]]))
+        self.assertAlmostEqual(values["purity"][-1], np.trace(rho_last @ rho_last).real)
+        self.assertAlmostEqual(values["trace"][-1], np.trace(rho_last))
+        self.assertAlmostEqual(values["<lambda>"][-1], np.abs(rho_last[0, -1]))
+        self.assertTrue(np.allclose(sim.rho_final, rho_last))
+
+    def test_observables_replace_trajectory_in_result(self):
+        """Test that requesting observables drops the full trajectory."""
+        params = DIIParameters(system_dim=2, apparatus_dim=6, t_final=1.0,
+                               random_seed=42)
+        result = DIISimulation(params).run_single_measurement(
+            observables=["purity", "information_gap"])
+
+        self.assertNotIn('rho_trajectory', result)
+        self.assertEqual(len(result['observables']['purity']), len(result['times']))
+        self.assertEqual(result['rho_final'].shape, (12, 12))
+
+        with self.assertRaises(ValueError):
+            DIISimulation(params).evolve(observables=["entropy"])
+
+    def test_unknown_backend_rejected(self):
+        """Test that an unknown backend name raises."""
+        params = DIIParameters(system_dim=2, apparatus_dim=4, backend="gpu")
+        with self.assertRaises(ValueError):
+            DIISimulation(params)
+
     def test_single_measurement_runs(self):
         """Test that single measurement completes without error."""
         sim = DIISimulation(self.params)
@@ -367,6 +867,51 @@ class TestDIISimulation(unittest.TestCase):
             "Should see multiple outcomes across different apparatus states")
 
 
+class TestQuantumTrajectories(unittest.TestCase):
+    """Test the quantum-jump unraveling of the master equation."""
+
+    def test_matches_density_matrix_evolution(self):
+        """Test trajectory average reproduces the master equation."""
+        params = DIIParameters(
+            system_dim=2,
+            apparatus_dim=6,
+            decoherence_rate=0.5,
+            t_final=3.0,
+            dt=0.05,
+            random_seed=42
+        )
+        times, rho_traj = DIISimulation(params).evolve()
+        dim = params.system_dim * params.apparatus_dim
+        rho_sys = partial_trace(rho_traj.reshape(-1, dim, dim),
+                                (params.system_dim, params.apparatus_dim), keep=(0,))
+
+        qt = DIIQuantumTrajectories(params, n_trajectories=4000)
+        times_qt, rho_sys_qt = qt.evolve()
+
+        self.assertTrue(np.allclose(times_qt, times))
+        # Statistical error ~ 1/(2√M)
+        self.assertTrue(np.allclose(rho_sys_qt, rho_sys, atol=0.03))
+        self.assertTrue(np.allclose(qt.density_matrix(), rho_traj[-1].reshape(dim, dim),
+                                    atol=0.03))
+
+    def test_large_apparatus_dimension(self):
+        """Test state-vector memory scaling at large apparatus dimension."""
+        params = DIIParameters(
+            system_dim=2,
+            apparatus_dim=20000,
+            t_final=1.0,
+            dt=0.1,
+            random_seed=42
+        )
+        qt = DIIQuantumTrajectories(params, n_trajectories=4)
+        result = qt.run_single_measurement()
+
+        self.assertEqual(result['psi_final'].shape, (4, 2 * 20000))
+        self.assertTrue(np.allclose(np.linalg.norm(result['psi_final'], axis=1), 1.0))
+        self.assertAlmostEqual(np.trace(result['rho_system_final']).real, 1.0)
+        self.assertIn(result['outcome'], [0, 1])
+
+
 class TestDIIEnsemble(unittest.TestCase):
     """Test ensemble statistics and Born rule verification."""
 
@@ -387,15 +932,360 @@ class TestDIIEnsemble(unittest.TestCase):
         self.assertEqual(len(stats['outcomes']), 10)
         self.assertEqual(len(stats['frequencies']), 2)
 
+    def test_batched_ensemble_matches_serial(self):
+        """Test stacked (B, D, D) evolution against trial-by-trial runs."""
+        params = DIIParameters(system_dim=2, apparatus_dim=8, t_final=3.0,
+                               dt=0.1, random_seed=42)
+
+        serial = DIIEnsemble(params, n_trials=5)
+        stats_serial = serial.run_ensemble(verbose=False)
+
+        batched = DIIEnsemble(params, n_trials=5)
+        stats_batched = batched.run_ensemble(verbose=False, batch_size=3)
+
+        self.assertTrue(np.array_equal(stats_serial['outcomes'],
+                                       stats_batched['outcomes']))
+        for r_serial, r_batched in zip(serial.results, batched.results):
+            self.assertTrue(np.allclose(r_batched['X_overlaps'], r_serial['X_overlaps']))
+            self.assertTrue(np.allclose(r_batched['rho_final'], r_serial['rho_final'],
+                                        atol=1e-6))
+            self.assertEqual(len(r_batched['info_history']), len(r_batched['times']))
+
+    def test_parallel_ensemble_bit_identical(self):
+        """Test results do not depend on the number of worker processes."""
+        params = DIIParameters(system_dim=2, apparatus_dim=8, t_final=2.0,
+                               dt=0.1, random_seed=42)
+
+        serial = DIIEnsemble(params, n_trials=7, chunk_size=3)
+        stats_serial = serial.run_ensemble(verbose=False, observables=["purity"])
+
+        parallel = DIIEnsemble(params, n_trials=7, chunk_size=3)
+        stats_parallel = parallel.run_ensemble(verbose=False, observables=["purity"],
+                                               workers=2)
+
+        self.assertTrue(np.array_equal(stats_serial['outcomes'],
+                                       stats_parallel['outcomes']))
+        self.assertTrue(np.array_equal(stats_serial['frequencies'],
+                                       stats_parallel['frequencies']))
+        for r_serial, r_parallel in zip(serial.results, parallel.results):
+            self.assertTrue(np.array_equal(r_serial['X_overlaps'], r_parallel['X_overlaps']))
+            self.assertTrue(np.array_equal(r_serial['rho_final'], r_parallel['rho_final']))
+
+    def test_nearby_seeds_give_independent_streams(self):
+        """Test base seeds s and s+1 do not share per-trial microstates."""
+        overlaps = []
+        for seed in (42, 43):
+            params = DIIParameters(system_dim=2, apparatus_dim=4, t_final=0.2,
+                                   dt=0.1, random_seed=seed)
+            ensemble = DIIEnsemble(params, n_trials=4, chunk_size=2)
+            ensemble.run_ensemble(verbose=False, observables=["trace"])
+            overlaps.append({tuple(r['X_overlaps']) for r in ensemble.results})
+
+        self.assertFalse(overlaps[0] & overlaps[1])
+
+    def test_outcomes_mode_matches_dynamics(self):
+        """Test the outcome-only path selects the same outcomes."""
+        params = DIIParameters(system_dim=2, apparatus_dim=8, t_final=1.0,
+                               dt=0.1, random_seed=42)
+
+        full = DIIEnsemble(params, n_trials=12, chunk_size=5)
+        stats_full = full.run_ensemble(verbose=False)
+
+        fast = DIIEnsemble(params, n_trials=12, chunk_size=5)
+        stats_fast = fast.run_ensemble(verbose=False, mode="outcomes", traced=[6])
+
+        self.assertTrue(np.array_equal(stats_full['outcomes'], stats_fast['outcomes']))
+        self.assertAlmostEqual(stats_full['chi_squared'], stats_fast['chi_squared'])
+
+        # Only the traced trial carries dynamics, with the same microstate
+        self.assertNotIn('rho_final', fast.results[5])
+        self.assertTrue(np.allclose(fast.results[6]['rho_final'],
+                                    full.results[6]['rho_final']))
+        self.assertTrue(np.allclose(fast.results[5]['X_overlaps'],
+                                    full.results[5]['X_overlaps']))
+
+    def test_analytic_sampler_outcomes_mode(self):
+        """Test analytic overlaps in outcomes mode, with a traced trial."""
+        params = DIIParameters(system_dim=2, apparatus_dim=10**6,
+                               random_seed=42, overlap_sampler="analytic")
+
+        ensemble = DIIEnsemble(params, n_trials=5000, chunk_size=1000)
+        stats = ensemble.run_ensemble(verbose=False, mode="outcomes")
+
+        self.assertTrue(np.all(np.abs(stats['frequencies'] - 0.5) < 0.03))
+
+        params = DIIParameters(system_dim=2, apparatus_dim=8, t_final=1.0,
+                               dt=0.1, random_seed=42, overlap_sampler="analytic")
+        untraced = DIIEnsemble(params, n_trials=4, chunk_size=4)
+        untraced.run_ensemble(verbose=False, mode="outcomes")
+        traced = DIIEnsemble(params, n_trials=4, chunk_size=4)
+        traced.run_ensemble(verbose=False, mode="outcomes", traced=[2])
+
+        # The traced trial integrates a state completed around its overlaps
+        self.assertIn('rho_final', traced.results[2])
+        self.assertTrue(np.allclose(traced.results[2]['X_overlaps'],
+                                    untraced.results[2]['X_overlaps']))
+        self.assertEqual(traced.results[2]['outcome'],
+                         untraced.results[2]['outcome'])
+
+        params.overlap_sampler = "exact"
+        with self.assertRaises(ValueError):
+            DIIEnsemble(params, n_trials=4).run_ensemble(verbose=False)
+
+    def test_analytic_outcomes_mode_matches_dynamics(self):
+        """Test both modes see the same analytic microstates per seed."""
+        for reduced in (False, True):
+            params = DIIParameters(system_dim=2, apparatus_dim=8, t_final=1.0,
+                                   dt=0.1, random_seed=42,
+                                   overlap_sampler="analytic",
+                                   reduced_model=reduced)
+
+            full = DIIEnsemble(params, n_trials=12, chunk_size=5)
+            stats_full = full.run_ensemble(verbose=False)
+            batched = DIIEnsemble(params, n_trials=12, chunk_size=5)
+            stats_batched = batched.run_ensemble(verbose=False, batch_size=3)
+            fast = DIIEnsemble(params, n_trials=12, chunk_size=5)
+            stats_fast = fast.run_ensemble(verbose=False, mode="outcomes",
+                                           traced=[6])
+
+            self.assertTrue(np.array_equal(stats_full['outcomes'],
+                                           stats_fast['outcomes']))
+            self.assertTrue(np.array_equal(stats_full['outcomes'],
+                                           stats_batched['outcomes']))
+            self.assertTrue(np.allclose(fast.results[6]['rho_final'],
+                                        full.results[6]['rho_final']))
+            self.assertTrue(np.allclose(batched.results[6]['rho_final'],
+                                        full.results[6]['rho_final'], atol=1e-6))
+            self.assertTrue(np.allclose(fast.results[5]['X_overlaps'],
+                                        full.results[5]['X_overlaps']))
+
+    def test_result_retention_policies(self):
+        """Test summary/first/final retention of per-trial results."""
+        params = DIIParameters(system_dim=2, apparatus_dim=6, t_final=1.0,
+                               dt=0.1, random_seed=42)
+
+        class RecordingEnsemble(DIIEnsemble):
+            def _iter_chunks(self, *args, **kwargs):
+                for start, results in super()._iter_chunks(*args, **kwargs):
+                    self.chunk_keys.extend(set(r) for r in results)
+                    yield start, results
+
+        # Chunk workers hand back results already reduced per trial
+        ensemble = RecordingEnsemble(params, n_trials=4, chunk_size=4,
+                                     retention="summary")
+        ensemble.chunk_keys = []
+        ensemble.run_ensemble(verbose=False)
+        self.assertEqual(ensemble.chunk_keys,
+                         [{'outcome', 'X_overlaps', 'amplitudes'}] * 4)
+
+        for retention, first_keys, last_keys in [
+            ("summary", {'outcome', 'X_overlaps', 'amplitudes'},
+             {'outcome', 'X_overlaps', 'amplitudes'}),
+            ("first", {'rho_trajectory', 'rho_final', 'times'},
+             {'outcome', 'X_overlaps', 'amplitudes'}),
+            ("final", {'outcome', 'rho_final'}, {'outcome', 'rho_final'}),
+        ]:
+            ensemble = DIIEnsemble(params, n_trials=5, chunk_size=2,
+                                   retention=retention, keep_first=2)
+            stats = ensemble.run_ensemble(verbose=False)
+
+            self.assertEqual(len(ensemble.results), 5)
+            self.assertTrue(first_keys <= set(ensemble.results[0]))
+            self.assertEqual(set(ensemble.results[-1]) & {'rho_trajectory'},
+                             first_keys & last_keys & {'rho_trajectory'})
+            self.assertTrue(last_keys <= set(ensemble.results[-1]))
+            self.assertEqual([r['outcome'] for r in ensemble.results],
+                             list(stats['outcomes']))
+
+    def test_result_disk_spill_reloads_lazily(self):
+        """Test full results spilled to per-chunk .npz shards reload unchanged."""
+        import tempfile
+        params = DIIParameters(system_dim=2, apparatus_dim=6, t_final=1.0,
+                               dt=0.1, random_seed=42)
+
+        in_memory = DIIEnsemble(params, n_trials=5, chunk_size=2)
+        in_memory.run_ensemble(verbose=False)
+
+        with tempfile.TemporaryDirectory() as spill_dir:
+            spilled = DIIEnsemble(params, n_trials=5, chunk_size=2,
+                                  retention="disk", spill_dir=spill_dir)
+            spilled.run_ensemble(verbose=False)
+
+            self.assertEqual(len(os.listdir(spill_dir)), 3)  # one per chunk
+            self.assertEqual(spilled.results[3]['outcome'],
+                             in_memory.results[3]['outcome'])
+            for r_mem, r_disk in zip(in_memory.results, spilled.results):
+                self.assertEqual(r_disk['outcome'], r_mem['outcome'])
+                self.assertTrue(np.array_equal(r_disk['rho_trajectory'],
+                                               r_mem['rho_trajectory']))
+                self.assertTrue(np.array_equal(r_disk['info_history'].values,
+                                               r_mem['info_history'].values))
+
+    def test_checkpoint_resume_matches_uninterrupted_run(self):
+        """Test an interrupted ensemble resumes to identical results."""
+        import tempfile
+        params = DIIParameters(system_dim=2, apparatus_dim=6, t_final=1.0,
+                               dt=0.1, random_seed=42)
+
+        class InterruptedEnsemble(DIIEnsemble):
+            def _iter_chunks(self, *args, **kwargs):
+                for n, chunk in enumerate(super()._iter_chunks(*args, **kwargs)):
+                    if n == 2:
+                        raise KeyboardInterrupt
+                    yield chunk
+
+        reference = DIIEnsemble(params, n_trials=7, chunk_size=2)
+        stats_ref = reference.run_ensemble(verbose=False)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "ensemble.ckpt")
+            with self.assertRaises(KeyboardInterrupt):
+                InterruptedEnsemble(params, n_trials=7, chunk_size=2).run_ensemble(
+                    verbose=False, checkpoint=path)
+
+            resumed = DIIEnsemble(params, n_trials=7, chunk_size=2)
+            stats = resumed.run_ensemble(verbose=False, checkpoint=path,
+                                         resume=True)
+
+            self.assertTrue(np.array_equal(stats['outcomes'], stats_ref['outcomes']))
+            self.assertTrue(np.array_equal(stats['frequencies'],
+                                           stats_ref['frequencies']))
+            for r, r_ref in zip(resumed.results, reference.results):
+                self.assertTrue(np.array_equal(r['rho_final'], r_ref['rho_final']))
+
+            # A checkpoint of a different run is rejected
+            with self.assertRaises(ValueError):
+                DIIEnsemble(params, n_trials=9, chunk_size=2).run_ensemble(
+                    verbose=False, checkpoint=path, resume=True)
+
+    def test_checkpoint_resume_with_disk_retention(self):
+        """Test a disk-retention run resumes into its saved spill_dir."""
+        import shutil
+        import tempfile
+        params = DIIParameters(system_dim=2, apparatus_dim=6, t_final=1.0,
+                               dt=0.1, random_seed=42)
+
+        class InterruptedEnsemble(DIIEnsemble):
+            def _iter_chunks(self, *args, **kwargs):
+                for n, chunk in enumerate(super()._iter_chunks(*args, **kwargs)):
+                    if n == 2:
+                        raise KeyboardInterrupt
+                    yield chunk
+
+        reference = DIIEnsemble(params, n_trials=7, chunk_size=2)
+        stats_ref = reference.run_ensemble(verbose=False)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "ensemble.ckpt")
+            # No spill_dir: each ensemble gets its own temporary directory
+            interrupted = InterruptedEnsemble(params, n_trials=7, chunk_size=2,
+                                              retention="disk")
+            self.addCleanup(shutil.rmtree, interrupted.results.spill_dir)
+            with self.assertRaises(KeyboardInterrupt):
+                interrupted.run_ensemble(verbose=False, checkpoint=path)
+
+            resumed = DIIEnsemble(params, n_trials=7, chunk_size=2,
+                                  retention="disk")
+            stats = resumed.run_ensemble(verbose=False, checkpoint=path,
+                                         resume=True)
+
+            self.assertEqual(resumed.results.spill_dir,
+                             interrupted.results.spill_dir)
+            self.assertTrue(np.array_equal(stats['outcomes'], stats_ref['outcomes']))
+            self.assertEqual(len(resumed.results), 7)
+            for r, r_ref in zip(resumed.results, reference.results):
+                self.assertTrue(np.array_equal(r['rho_final'], r_ref['rho_final']))
+
+    def test_didc_checkpoint_resume_restores_rng(self):
+        """Test a resumed didc_simulation run ignores the current global seed."""
+        import contextlib
+        import io
+        import tempfile
+        from unittest import mock
+        try:
+            import didc_simulation
+        except ImportError as exc:  # matplotlib is needed for its plots
+            self.skipTest(f"didc_simulation unavailable: {exc}")
+
+        amplitudes = np.array([np.sqrt(0.3), np.sqrt(0.7)])
+        measurement = didc_simulation.SingleMeasurement
+        calls = []
+
+        def interrupt_at_20(*args, **kwargs):
+            if len(calls) == 20:
+                raise KeyboardInterrupt
+            calls.append(1)
+            return measurement(*args, **kwargs)
+
+        with contextlib.redirect_stdout(io.StringIO()), \
+                tempfile.TemporaryDirectory() as tmp:
+            np.random.seed(7)
+            reference = didc_simulation.EnsembleSimulation(amplitudes,
+                                                           apparatus_dim=50)
+            reference.run(num_trials=50)
+
+            path = os.path.join(tmp, "didc.npz")
+            np.random.seed(7)
+            interrupted = didc_simulation.EnsembleSimulation(amplitudes,
+                                                             apparatus_dim=50)
+            with mock.patch.object(didc_simulation, "SingleMeasurement",
+                                   interrupt_at_20):
+                with self.assertRaises(KeyboardInterrupt):
+                    interrupted.run(num_trials=50, checkpoint=path,
+                                    checkpoint_every=10)
+
+            np.random.seed(12345)  # the checkpoint's RNG state must win
+            resumed = didc_simulation.EnsembleSimulation(amplitudes,
+                                                         apparatus_dim=50)
+            resumed.run(num_trials=50, checkpoint=path, checkpoint_every=10,
+                        resume=True)
+
+        self.assertTrue(np.array_equal(resumed.outcomes, reference.outcomes))
+        self.assertTrue(np.array_equal(resumed.weights_per_run,
+                                       reference.weights_per_run))
+
+    def test_batch_collapse_factor_per_member(self):
+        """Test each batch member gets the collapse factor of its own state."""
+        params = DIIParameters(system_dim=2, apparatus_dim=4, random_seed=0)
+        batch = DIIBatchSimulation(params, seeds=[0, 1])
+
+        # Member 0 projected onto outcome 0, member 1 left in superposition
+        rho = batch.rho_initial.copy()
+        blocks = rho.reshape(2, 2, 4, 2, 4)
+        blocks[0, 0, :, 1, :] = 0
+        blocks[0, 1, :, :, :] = 0
+        rho[0] /= np.trace(rho[0])
+
+        F = batch.collapse_factors(rho)
+        self.assertGreater(F[0], F[1])
+        self.assertAlmostEqual(F[1], 0.0, places=6)
+
+    def test_batch_honours_or_rejects_run_options(self):
+        """Test history_length is applied and unsupported options raise."""
+        params = DIIParameters(system_dim=2, apparatus_dim=4, t_final=1.0,
+                               dt=0.1, random_seed=0, history_length=3)
+        batch = DIIBatchSimulation(params, seeds=[0, 1])
+        results = batch.run_measurements()
+
+        self.assertEqual(len(results[0]['info_history']), 3)
+        self.assertAlmostEqual(results[1]['info_history'].times[-1], 0.9)
+
+        for option in ({"interaction_picture": True},
+                       {"pure_state_tolerance": 1e-3}):
+            with self.assertRaises(ValueError):
+                DIIBatchSimulation(DIIParameters(**option), seeds=[0, 1])
+
     def test_born_rule_statistical_test(self):
         """
         Test Born rule emergence with statistical significance.
 
         For uniform superposition |+⟩ = (|0⟩ + |1⟩)/√2,
-        Born rule predicts P(0) = P(1) = 0.5.
+        Born rule predicts P(0) = P(1) = 0.5. The outcomes are the ones the
+        dynamics would select (see the outcomes-mode equivalence test), so
+        the 500 trials are not integrated.
         """
         ensemble = DIIEnsemble(self.params, n_trials=500)
-        stats = ensemble.run_ensemble(verbose=False)
+        stats = ensemble.run_ensemble(verbose=False, mode="outcomes")
 
         # Chi-squared test
         chi2_stat = stats['chi_squared']
@@ -423,7 +1313,7 @@ class TestDIIEnsemble(unittest.TestCase):
                 random_seed=42
             )
             ensemble = DIIEnsemble(params, n_trials=500)
-            stats = ensemble.run_ensemble(verbose=False)
+            stats = ensemble.run_ensemble(verbose=False, mode="outcomes")
 
             # Maximum deviation from Born rule
             deviation = np.max(np.abs(stats['frequencies'] - stats['born_rule']))
@@ -554,7 +1444,7 @@ class TestPhysicsValidation(unittest.TestCase):
             "Purity should decrease with decoherence")
 
 
-class TestNumericalStability(unittest.TestCase):
+class TestNumericalStability(SimulationTestCase):
     """Test numerical stability and error handling."""
 
     def test_no_nan_or_inf(self):
@@ -583,13 +1473,17 @@ class TestNumericalStability(unittest.TestCase):
             random_seed=42
         )
 
-        # Should complete without error (may be slow)
+        # Observables instead of the D² trajectory; O(D²) block RHS
+        params.backend = "block"
         with warnings.catch_warnings():
             warnings.simplefilter("ignore")
             sim = DIISimulation(params)
-            result = sim.run_single_measurement()
+            result = sim.run_single_measurement(observables=["populations",
+                                                             "purity"])
 
         self.assertIsNotNone(result['outcome'])
+        self.assertNotIn('rho_trajectory', result)
+        self.assertFalse(np.any(np.isnan(result['rho_final'])))
 
     def test_short_evolution_time(self):
         """Test with very short evolution time."""
@@ -606,6 +1500,72 @@ class TestNumericalStability(unittest.TestCase):
         # Should still produce valid outcome
         self.assertIn(result['outcome'], [0, 1])
 
+    def test_single_precision_matches_double(self):
+        """Test complex64 runs stay close to complex128 with small drift."""
+        observables = ["populations", "coherences", "purity", "information_gap"]
+        params = DIIParameters(system_dim=3, apparatus_dim=10, t_final=3.0,
+                               dt=0.1, random_seed=5, threshold=0.01)
+        _, reference = DIISimulation(params).evolve(observables=observables)
+
+        for integrator in ("RK45", "strang"):
+            single = DIIParameters(system_dim=3, apparatus_dim=10, t_final=3.0,
+                                   dt=0.1, random_seed=5, threshold=0.01,
+                                   integrator=integrator, dtype="complex64")
+            sim = DIISimulation(single)
+            for _, rho_final in sim.iter_evolution():
+                self.assertEqual(rho_final.dtype, np.complex64)
+
+            trace = np.trace(rho_final)
+            self.assertAlmostEqual(trace.real, 1.0, places=5)
+            self.assertTrue(np.allclose(rho_final, rho_final.conj().T, atol=1e-6))
+            self.assertIsNone(sim.precision_fallback)
+
+            _, values = DIISimulation(single).evolve(observables=observables)
+            self._assert_observables_close(values, reference, atol=1e-4)
+
+        # Tolerances below float32 resolution are clamped, not chased
+        tight = DIIParameters(system_dim=3, apparatus_dim=10, t_final=3.0,
+                              dt=0.1, random_seed=5, threshold=0.01,
+                              integrator="strang", dtype="complex64",
+                              rtol=1e-9, atol=1e-11)
+        _, values = DIISimulation(tight).evolve(observables=observables)
+        self._assert_observables_close(values, reference, atol=1e-4)
+
+        with self.assertRaises(ValueError):
+            DIISimulation(DIIParameters(dtype="float32"))
+
+    def test_precision_fallback_to_double(self):
+        """Test drift past precision_tolerance continues in complex128."""
+        observables = ["populations", "coherences", "purity"]
+        params = DIIParameters(system_dim=3, apparatus_dim=10, t_final=3.0,
+                               dt=0.1, random_seed=5, threshold=0.01)
+        _, reference = DIISimulation(params).evolve(observables=observables)
+        reference_batch = DIIBatchSimulation(params, [1, 2]).run_measurements(
+            observables=observables)
+
+        params.dtype = "complex64"
+        params.precision_tolerance = 1e-12  # every interval drifts past this
+        sim = DIISimulation(params)
+        batch = DIIBatchSimulation(params, [1, 2])
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            times, values = sim.evolve(observables=observables)
+            results = batch.run_measurements(observables=observables)
+
+        self.assertEqual(len(caught), 2)
+        for owner in (sim, batch):
+            self.assertAlmostEqual(owner.precision_fallback, 0.1)
+            self.assertEqual(owner.params.dtype, "complex128")
+        self.assertEqual(params.dtype, "complex64")
+
+        # Each output time is recorded once, across the switch
+        self.assertEqual(len(sim.info_func.history), len(times))
+        self.assertEqual(len(batch.histories[0]), len(times))
+        self._assert_observables_close(values, reference, atol=1e-6)
+        for result, expected in zip(results, reference_batch):
+            self._assert_observables_close(result['observables'],
+                                           expected['observables'], atol=1e-6)
+
 
 def run_comprehensive_tests():
     """Run full test suite with detailed output."""
@@ -622,6 +1582,7 @@ def run_comprehensive_tests():
     suite.addTests(loader.loadTestsFromTestCase(TestInformationFunctional))
     suite.addTests(loader.loadTestsFromTestCase(TestCollapseDynamics))
     suite.addTests(loader.loadTestsFromTestCase(TestDIISimulation))
+    suite.addTests(loader.loadTestsFromTestCase(TestQuantumTrajectories))
     suite.addTests(loader.loadTestsFromTestCase(TestDIIEnsemble))
     suite.addTests(loader.loadTestsFromTestCase(TestPhysicsValidation))
     suite.addTests(loader.loadTestsFromTestCase(TestNumericalStability))